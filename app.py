@@ -3,15 +3,17 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, date
 import openai
-from openai import OpenAI
 from PIL import Image
 import os
 import json
+import uuid
 from dateutil import tz
 from dotenv import load_dotenv
 from fortune_engine import FortuneEngine
 from partner_matcher import PartnerMatcher
-from face_generator import FaceGenerator
+from face_service import get_face_service
+from openai_client import get_openai_client, warm_up_client
+from prefetch import SpeculativePrefetcher
 
 # Load environment variables
 load_dotenv()
@@ -21,12 +23,13 @@ api_key = os.getenv("OPENAI_API_KEY")
 if api_key:
     # Set global API key for older-style usage
     openai.api_key = api_key
-    # Create client with minimal parameters - avoid incompatible 'proxies'
-    try:
-        client = OpenAI(api_key=api_key)
-    except TypeError as e:
-        print(f"Warning: Could not initialize OpenAI client: {e}")
-        client = None
+    # Shared pooled client; open its connection now so TLS setup stays off the request path
+    client = get_openai_client()
+    warm_up_client()
+
+# Latency budget for GPT-enhanced story sections; slower sections keep the template text.
+# Off unless ENHANCE_BUDGET_SECONDS is set, since it adds GPT calls to every reading
+ENHANCE_BUDGET_SECONDS = float(os.environ["ENHANCE_BUDGET_SECONDS"]) if os.getenv("ENHANCE_BUDGET_SECONDS") else None
 
 # Check if using Azure OpenAI
 if os.getenv("AZURE_OPENAI_API_KEY"):
@@ -448,8 +451,15 @@ def main():
         st.session_state.partner_profile = None
     if 'generated_face' not in st.session_state:
         st.session_state.generated_face = None
+    if 'face_render' not in st.session_state:
+        st.session_state.face_render = None
     if 'profile_data' not in st.session_state:
         st.session_state.profile_data = None
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    if 'prefetcher' not in st.session_state:
+        st.session_state.prefetcher = SpeculativePrefetcher(st.session_state.session_id)
+    prefetcher = st.session_state.prefetcher
         
     st.title("Mystic Harmony 🌟")
     st.subheader("Eastern & Western Astrology Combined")
@@ -618,15 +628,27 @@ def main():
                     key="birth_time_advanced"
                 )
     
+            # 입력이 바뀌면 이전 입력으로 진행 중이던 투기적 작업을 폐기
+            fortune_inputs = (birth_date, birth_time_options[birth_time])
+            if prefetcher.key is not None and prefetcher.key != fortune_inputs:
+                prefetcher.cancel()
+    
             if st.button("✨ Read My Fortune", type="primary", key="read_fortune_advanced"):
                 with st.spinner("Consulting the cosmic wisdom..."):
                     # FortuneEngine 초기화 및 분석
-                    engine = FortuneEngine()
+                    engine = FortuneEngine(session_id=st.session_state.session_id)
                     result = engine.analyze_fortune(
                         birth_date=birth_date,
-                        birth_time=birth_time_options[birth_time]
+                        birth_time=birth_time_options[birth_time],
+                        enhance_budget=ENHANCE_BUDGET_SECONDS
                     )
                     st.session_state.fortune_result = result
+                    st.session_state.fortune_inputs = fortune_inputs
+                    st.session_state.partner_profile = None
+                    st.session_state.generated_face = None
+                    st.session_state.face_render = None
+                    # 다음 단계(파트너 매칭, 얼굴 생성)를 백그라운드에서 미리 실행
+                    prefetcher.start(fortune_inputs, result)
     
             # 결과 표시
             if st.session_state.fortune_result:
@@ -739,10 +761,16 @@ def main():
             if st.button("💘 Find My Soulmate", type="primary", key="find_soulmate"):
                 with st.spinner("Searching the cosmic connections..."):
                     if st.session_state.fortune_result is not None:
-                        # FortuneEngine 결과가 있는 경우 사용
-                        matcher = PartnerMatcher()
-                        partner_profile = matcher.find_ideal_partner(st.session_state.fortune_result)
+                        # FortuneEngine 결과가 있는 경우 사용 (미리 계산된 결과가 있으면 재사용)
+                        fortune_inputs = st.session_state.get('fortune_inputs')
+                        partner_profile = prefetcher.take_partner(fortune_inputs)
+                        if partner_profile is None:
+                            matcher = PartnerMatcher(session_id=st.session_state.session_id)
+                            partner_profile = matcher.find_ideal_partner(st.session_state.fortune_result)
+                            prefetcher.prefetch_face(fortune_inputs, st.session_state.fortune_result, partner_profile)
                         st.session_state.partner_profile = partner_profile
+                        st.session_state.generated_face = None
+                        st.session_state.face_render = None
                     elif st.session_state.profile_data is not None:
                         # 간단 모드의 결과가 있는 경우 사용
                         data = st.session_state.profile_data
@@ -840,20 +868,48 @@ def main():
         if st.session_state.partner_profile is None:
             st.warning("Please generate your ideal partner profile first!")
         else:
+            face_service = get_face_service()
             if st.button("🎨 Generate Partner's Face", type="primary", key="generate_face"):
                 with st.spinner("Creating your soulmate's image..."):
-                    generator = FaceGenerator()
-                    face_result = generator.generate_partner_face(
-                        st.session_state.fortune_result,
+                    face_result = prefetcher.take_face(
+                        st.session_state.get('fortune_inputs'),
                         st.session_state.partner_profile
                     )
+                if face_result is not None:
                     st.session_state.generated_face = face_result
+                else:
+                    # 렌더링은 작업자 프로세스 풀에서 실행하고 결과를 폴링
+                    st.session_state.face_render = face_service.submit(st.session_state.partner_profile)
+            
+            if st.session_state.generated_face:
+                image = st.session_state.generated_face['image']
+                if isinstance(image, str) and not os.path.exists(image) and st.session_state.face_render is None:
+                    # 얼굴 저장소에서 정리된 경우 다시 생성 (같은 입력이면 같은 이미지)
+                    st.session_state.generated_face = None
+                    st.session_state.face_render = face_service.submit(st.session_state.partner_profile)
+            
+            face_render = st.session_state.face_render
+            if face_render is not None:
+                if face_render['status'] == 'pending':
+                    with st.spinner("Creating your soulmate's image..."):
+                        face_render = face_service.poll(face_render['image_key'], timeout=0.5)
+                if face_render['status'] == 'pending':
+                    # 스크립트 스레드를 붙잡지 않고 잠시 후 다시 확인
+                    st.session_state.face_render = face_render
+                    st.rerun()
+                st.session_state.face_render = None
+                if face_render['status'] == 'ready':
+                    st.session_state.generated_face = face_render['result']
+                elif face_render['status'] == 'busy':
+                    st.warning("Many soulmates are being drawn right now. Please try again in a moment.")
+                else:
+                    st.error("Could not create the image. Please try again.")
             
             if st.session_state.generated_face:
                 col1, col2 = st.columns([2, 1])
-                
+
                 with col1:
-                    st.image(f"data:image/png;base64,{st.session_state.generated_face['image']}", caption="Your Ideal Partner")
+                    st.image(st.session_state.generated_face['image'], caption="Your Ideal Partner")
                 
                 with col2:
                     st.markdown("### 🎨 Visual Characteristics")
@@ -0,0 +1,359 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import itertools
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterable, Optional, Callable
+
+# 배치 작업 상태 (OpenAI Batch API와 동일한 이름 사용)
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# 별자리·띠·주요 오행만으로 프롬프트가 정해지는 섹션
+# (life_path, relationships는 사용자별 오행 비율이 들어가 미리 생성해도 적중하지 않음)
+BATCH_SECTIONS = ["personality", "career", "current_year"]
+
+
+def prompt_key(model: str, system_prompt: str, prompt: str) -> str:
+    """
+    Idempotent key for a prompt, used as the batch custom_id and store key
+
+    Batches always run on a section's preferred tier, and the enhancer looks
+    stored results up under the preferred tier's model even while the router
+    has downgraded the section, so a downgrade does not miss the store.
+    max_tokens is not part of the key: it follows from the section's word
+    limit, which is in the prompt text. Changing only the token headroom
+    keeps serving older entries until they are refreshed (see run_batch).
+
+    Args:
+        model: Model name
+        system_prompt: System message content
+        prompt: User message content
+
+    Returns:
+        Hex SHA-256 digest of the request content
+    """
+    payload = json.dumps([model, system_prompt, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PromptStore:
+    """
+    Persistent prompt-keyed store of completed GPT responses (SQLite)
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS prompt_results ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock, self._connection() as conn:
+            row = conn.execute("SELECT text FROM prompt_results WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def contains(self, key: str, max_age: Optional[float] = None) -> bool:
+        """
+        True if the key is stored and, with max_age, was stored within max_age seconds
+        """
+        if max_age is None:
+            return self.get(key) is not None
+        with self._lock, self._connection() as conn:
+            row = conn.execute("SELECT created_at FROM prompt_results WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] >= time.time() - max_age
+
+    def put_many(self, rows: Iterable[tuple]) -> int:
+        """
+        Insert (key, model, text) rows, replacing existing keys
+
+        Returns:
+            Number of stored rows
+        """
+        now = time.time()
+        with self._lock, self._connection() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR REPLACE INTO prompt_results (key, model, text, created_at) VALUES (?, ?, ?, ?)",
+                [(key, model, text, now) for key, model, text in rows]
+            )
+            return conn.total_changes - before
+
+    def __len__(self) -> int:
+        with self._lock, self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM prompt_results").fetchone()[0]
+
+
+def write_batch_file(path: str, requests: List[Dict[str, Any]]) -> int:
+    """
+    Write chat-completion requests as a JSONL batch-request file
+
+    Args:
+        path: Output file path
+        requests: Dictionaries with custom_id, model, messages, max_tokens, temperature
+
+    Returns:
+        Number of lines written
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            body = {key: value for key, value in request.items() if key != "custom_id"}
+            f.write(json.dumps({
+                "custom_id": request["custom_id"],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            }, ensure_ascii=False) + "\n")
+    return len(requests)
+
+
+def parse_batch_results(lines: Iterable[str]) -> List[tuple]:
+    """
+    Parse a JSONL batch-output file into (custom_id, model, text) rows
+
+    Failed lines are skipped so they are retried by the next batch.
+    """
+    rows = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            continue
+        body = response.get("body") or {}
+        choices = body.get("choices") or []
+        if not choices:
+            continue
+        text = (choices[0].get("message") or {}).get("content")
+        if text:
+            rows.append((record["custom_id"], body.get("model", ""), text.strip()))
+    return rows
+
+
+class BatchBackend:
+    """
+    Interface for batch execution backends
+    """
+
+    def submit(self, batch_file: str) -> str:
+        """Submit a JSONL batch-request file and return a batch id"""
+        raise NotImplementedError
+
+    def status(self, batch_id: str) -> str:
+        """Return the batch status (validating, in_progress, completed, failed, ...)"""
+        raise NotImplementedError
+
+    def results(self, batch_id: str) -> List[str]:
+        """Return the lines of the batch-output file"""
+        raise NotImplementedError
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """
+    Backend using the OpenAI Batch API (files + batches endpoints)
+    """
+
+    def __init__(self, client, completion_window: str = "24h"):
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, batch_file: str) -> str:
+        with open(batch_file, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> List[str]:
+        batch = self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return []
+        return self.client.files.content(batch.output_file_id).text.splitlines()
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Local stand-in backend for testing: answers each request with a
+    generator function and writes an OpenAI-format output file
+    """
+
+    def __init__(self, work_dir: str, generate: Optional[Callable[[Dict[str, Any]], str]] = None,
+                 delay: float = 0.0):
+        """
+        Args:
+            work_dir: Directory for output files
+            generate: Function mapping a request body to response text
+            delay: Seconds before a submitted batch reports completion
+        """
+        self.work_dir = work_dir
+        self.generate = generate or (lambda body: "The stars align in quiet harmony. " + body["messages"][-1]["content"][:40].strip())
+        self.delay = delay
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        os.makedirs(work_dir, exist_ok=True)
+
+    def submit(self, batch_file: str) -> str:
+        batch_id = f"batch_local_{next(self._ids)}"
+        output_path = os.path.join(self.work_dir, f"{batch_id}_output.jsonl")
+        with open(batch_file, "r", encoding="utf-8") as src, open(output_path, "w", encoding="utf-8") as out:
+            for line in src:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                body = request["body"]
+                out.write(json.dumps({
+                    "id": f"{batch_id}_req_{request['custom_id'][:8]}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "model": body["model"],
+                            "choices": [{"index": 0, "message": {"role": "assistant", "content": self.generate(body)},
+                                         "finish_reason": "stop"}]
+                        }
+                    },
+                    "error": None
+                }, ensure_ascii=False) + "\n")
+        self._batches[batch_id] = {"ready_at": time.monotonic() + self.delay, "output": output_path}
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        batch = self._batches[batch_id]
+        return "completed" if time.monotonic() >= batch["ready_at"] else "in_progress"
+
+    def results(self, batch_id: str) -> List[str]:
+        with open(self._batches[batch_id]["output"], "r", encoding="utf-8") as f:
+            return f.readlines()
+
+
+def run_batch(backend: BatchBackend, store: PromptStore, requests: List[Dict[str, Any]],
+              batch_file: str, poll_interval: float = 30.0,
+              timeout: Optional[float] = None, max_age: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Write, submit, poll and ingest one batch
+
+    Requests whose key is already in the store are skipped, so reruns
+    only pay for prompts that have not completed yet. With max_age,
+    entries older than that are regenerated and replaced.
+
+    Args:
+        backend: Batch execution backend
+        store: Persistent prompt store to ingest results into
+        requests: Batch requests (see write_batch_file)
+        batch_file: Path for the JSONL batch-request file
+        poll_interval: Seconds between status polls
+        timeout: Maximum seconds to wait for completion
+        max_age: Seconds after which a stored result is regenerated (None = never)
+
+    Returns:
+        Summary with batch id, status and counts
+    """
+    pending = [request for request in requests if not store.contains(request["custom_id"], max_age)]
+    summary = {"batch_id": None, "status": "skipped", "requested": len(requests),
+               "submitted": len(pending), "ingested": 0}
+    if not pending:
+        return summary
+
+    write_batch_file(batch_file, pending)
+    batch_id = backend.submit(batch_file)
+    summary["batch_id"] = batch_id
+
+    started = time.monotonic()
+    status = backend.status(batch_id)
+    while status not in TERMINAL_STATUSES:
+        if timeout is not None and time.monotonic() - started > timeout:
+            break
+        time.sleep(poll_interval)
+        status = backend.status(batch_id)
+    summary["status"] = status
+
+    if status == "completed":
+        summary["ingested"] = store.put_many(parse_batch_results(backend.results(batch_id)))
+    return summary
+
+
+def main():
+    """
+    Nightly regeneration of the per-sign fortune sections
+
+    Missing entries and entries older than --max-age-days are generated
+    again and replace the stored text.
+    """
+    import argparse
+
+    live_store = os.getenv("GPT_PROMPT_STORE", "gpt_prompt_store.sqlite3")
+    parser = argparse.ArgumentParser(description="Bulk offline GPT enhancement through a batch file")
+    parser.add_argument("--store", default=live_store)
+    parser.add_argument("--batch-file", default="gpt_batch_requests.jsonl")
+    parser.add_argument("--backend", choices=["openai", "local"], default="openai",
+                        help="local writes placeholder text and needs a --store other than the app's")
+    parser.add_argument("--max-age-days", type=float, default=7.0,
+                        help="Regenerate stored entries older than this (default 7)")
+    parser.add_argument("--poll-interval", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=None)
+    args = parser.parse_args()
+
+    # 테스트용 백엔드의 자리표시 문구가 앱이 읽는 저장소에 들어가지 않게 막음
+    if args.backend == "local" and os.path.abspath(args.store) == os.path.abspath(live_store):
+        parser.error(f"--backend local would write placeholder text into the live prompt store "
+                     f"{live_store}; pass a different --store")
+
+    os.environ["GPT_PROMPT_STORE"] = args.store
+    from gpt_enhancer import GPTEnhancer
+    from rate_limiter import PRIORITY_BACKGROUND
+
+    enhancer = GPTEnhancer(priority=PRIORITY_BACKGROUND)
+    elements = ["Wood", "Fire", "Earth", "Metal", "Water"]
+    signs = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+             "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
+    animals = ["Rat", "Ox", "Tiger", "Rabbit", "Dragon", "Snake",
+               "Horse", "Goat", "Monkey", "Rooster", "Dog", "Pig"]
+
+    with enhancer.batch_mode() as pending:
+        for sign, animal, element in itertools.product(signs, animals, elements):
+            enhancer.enhance_fortune_reading({
+                "western_zodiac": {"sign": sign},
+                "chinese_zodiac": {"animal": animal},
+                "four_pillars": {"dominant_element": element}
+            }, sections=BATCH_SECTIONS)
+
+    if args.backend == "openai":
+        backend = OpenAIBatchBackend(enhancer.client)
+    else:
+        backend = LocalBatchBackend(os.path.dirname(os.path.abspath(args.batch_file)))
+    summary = run_batch(backend, PromptStore(args.store), list(pending.values()),
+                        args.batch_file, args.poll_interval, args.timeout, args.max_age_days * 86400)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Stage timings and pixel regression checks for partner face rendering
+
+Renders every (primary element, western zodiac, Chinese texture) branch
+with a fixed seed, times each stage (aura, outline, eyes, nose/mouth,
+texture, effects, encode) and compares two hashes of every image against
+the golden values in benchmarks/face_golden.json:
+
+- pixels: SHA-256 of the raw RGB pixels (any change at all)
+- dhash: 64-bit difference hash; a Hamming distance above --max-distance
+  means the face visibly changed
+
+Usage:
+    python benchmarks/bench_face.py --output face_report.json
+    python benchmarks/bench_face.py --baseline face_report.json --max-slowdown 1.3
+    python benchmarks/bench_face.py --update-golden
+
+Layers are rendered cold (the layer cache is disabled) unless --warm is
+given. The exit status is 1 when an image changed beyond the tolerance
+(or at all with --exact) or a stage got slower than --max-slowdown times
+the baseline report, so the script can gate CI.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face_golden.json")
+ELEMENTS = ["Wood", "Fire", "Earth", "Metal", "Water"]
+COLORS = ["#4CAF50", "#2196F3", "#9C27B0"]
+STAGES = ["aura", "outline", "eyes", "nose_mouth", "texture", "effects", "encode"]
+SEED = 0
+# 이보다 짧은 단계는 측정 잡음이 커서 속도 회귀로 보지 않음
+NOISE_FLOOR_MS = 0.2
+
+
+def dhash(image, hash_size: int = 8) -> str:
+    """Difference hash: sign of horizontal gradients of a tiny grayscale copy"""
+    import numpy as np
+    from PIL import Image
+
+    small = np.asarray(image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS), dtype=np.int16)
+    bits = (small[:, :-1] > small[:, 1:]).ravel()
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):0{hash_size * hash_size // 4}x}"
+
+
+def hamming(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def branches(generator) -> List[Dict[str, Any]]:
+    """One render per primary element x western zodiac x distinct Chinese texture"""
+    textures = {}
+    for chinese, texture in generator.chinese_zodiac_textures.items():
+        textures.setdefault(texture, chinese)
+    rows = []
+    for index, element in enumerate(ELEMENTS):
+        # 두 번째 오행도 효과에 쓰이므로 순환시켜 모든 조합이 한 번씩 나오게 함
+        elements = [element, ELEMENTS[(index + 1) % len(ELEMENTS)]]
+        for zodiac in generator.zodiac_shapes:
+            for texture, chinese in textures.items():
+                rows.append({"name": f"{element}/{zodiac}/{texture}", "elements": elements,
+                             "zodiac": zodiac, "chinese": chinese})
+    return rows
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def run(size, image_format: str, repeat: int) -> Dict[str, Any]:
+    """Render and time every branch; returns the report without comparisons"""
+    import numpy
+    import PIL
+    from face_generator import FaceGenerator, encode_image
+
+    generator = FaceGenerator(seed=SEED)
+    stage_ms = {stage: [] for stage in STAGES}
+    images = {}
+    for branch in branches(generator):
+        best = None
+        for _ in range(repeat):
+            timings = {}
+            started = time.perf_counter()
+            image = generator._create_abstract_face(branch["elements"], branch["zodiac"], branch["chinese"],
+                                                    COLORS, size, timings=timings)
+            encode_started = time.perf_counter()
+            encode_image(image, image_format)
+            timings["encode"] = time.perf_counter() - encode_started
+            timings["total"] = time.perf_counter() - started
+            if best is None or timings["total"] < best["total"]:
+                best = timings
+        for stage in STAGES:
+            stage_ms[stage].append(best.get(stage, 0.0) * 1000)
+        images[branch["name"]] = {
+            "pixels": hashlib.sha256(image.tobytes()).hexdigest()[:32],
+            "dhash": dhash(image),
+            "total_ms": best["total"] * 1000,
+        }
+
+    stages = {}
+    for stage, values in stage_ms.items():
+        stages[stage] = {"mean_ms": sum(values) / len(values), "p50_ms": percentile(values, 50),
+                         "p95_ms": percentile(values, 95), "max_ms": max(values)}
+    totals = [row["total_ms"] for row in images.values()]
+    return {
+        "seed": SEED,
+        "size": list(size),
+        "format": image_format,
+        "repeat": repeat,
+        "versions": {"python": sys.version.split()[0], "pillow": PIL.__version__, "numpy": numpy.__version__},
+        "branches": len(images),
+        "stages": stages,
+        "total": {"mean_ms": sum(totals) / len(totals), "p95_ms": percentile(totals, 95)},
+        "images": images,
+    }
+
+
+def compare_golden(report: Dict[str, Any], golden: Dict[str, Any], max_distance: int, exact: bool) -> List[str]:
+    """Annotate report images with their golden status and return failure messages"""
+    failures = []
+    golden_images = golden.get("images", {})
+    for name, image in report["images"].items():
+        expected = golden_images.get(name)
+        if expected is None:
+            image["status"] = "new"
+            failures.append(f"{name}: no golden hash (run with --update-golden)")
+            continue
+        distance = hamming(image["dhash"], expected["dhash"])
+        image["dhash_distance"] = distance
+        if image["pixels"] == expected["pixels"]:
+            image["status"] = "identical"
+        elif distance <= max_distance and not exact:
+            image["status"] = "drift"
+        else:
+            image["status"] = "changed"
+            failures.append(f"{name}: image changed (dhash distance {distance})")
+    for name in golden_images:
+        if name not in report["images"]:
+            failures.append(f"{name}: branch missing from this run")
+    return failures
+
+
+def compare_baseline(report: Dict[str, Any], baseline: Dict[str, Any], max_slowdown: float) -> List[str]:
+    """Annotate report stages with their baseline ratio and return failure messages"""
+    failures = []
+    for stage, stats in report["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before:
+            continue
+        ratio = stats["p50_ms"] / before["p50_ms"] if before["p50_ms"] > 0 else 1.0
+        stats["baseline_p50_ms"] = before["p50_ms"]
+        stats["ratio"] = ratio
+        if ratio > max_slowdown and stats["p50_ms"] - before["p50_ms"] > NOISE_FLOOR_MS:
+            failures.append(f"{stage}: p50 {stats['p50_ms']:.2f} ms vs baseline {before['p50_ms']:.2f} ms "
+                            f"({ratio:.2f}x)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark face rendering stages and check golden pixel hashes")
+    parser.add_argument("--size", default="500x600", help="WIDTHxHEIGHT (golden hashes are for 500x600)")
+    parser.add_argument("--format", default="png", help="Encoding timed in the encode stage")
+    parser.add_argument("--repeat", type=int, default=3, help="Renders per branch (fastest is reported)")
+    parser.add_argument("--warm", action="store_true", help="Keep the layer cache enabled")
+    parser.add_argument("--golden", default=GOLDEN_PATH)
+    parser.add_argument("--update-golden", action="store_true", help="Write this run's hashes as the golden values")
+    parser.add_argument("--max-distance", type=int, default=4, help="Allowed dhash distance for non-identical pixels")
+    parser.add_argument("--exact", action="store_true", help="Fail on any pixel change")
+    parser.add_argument("--baseline", default=None, help="Earlier report to compare stage timings against")
+    parser.add_argument("--max-slowdown", type=float, default=1.3)
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if not args.warm:
+        # 레이어 캐시를 끄고 모든 단계를 매번 새로 렌더링
+        os.environ["FACE_LAYER_CACHE_BYTES"] = "0"
+    size = tuple(int(value) for value in args.size.lower().split("x"))
+    report = run(size, args.format, args.repeat)
+    report["warm"] = args.warm
+
+    failures = []
+    if args.update_golden:
+        golden = {key: report[key] for key in ("seed", "size", "versions")}
+        golden["images"] = {name: {"pixels": image["pixels"], "dhash": image["dhash"]}
+                            for name, image in report["images"].items()}
+        with open(args.golden, "w", encoding="utf-8") as f:
+            json.dump(golden, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"Wrote {len(golden['images'])} golden hashes to {args.golden}")
+    elif os.path.exists(args.golden):
+        with open(args.golden, "r", encoding="utf-8") as f:
+            golden = json.load(f)
+        if list(size) != golden.get("size"):
+            print(f"Warning: golden hashes are for {golden.get('size')}, skipping the pixel check")
+        else:
+            if golden.get("versions", {}).get("pillow") != report["versions"]["pillow"]:
+                print(f"Warning: golden hashes were made with Pillow {golden['versions'].get('pillow')}, "
+                      f"running {report['versions']['pillow']}")
+            failures += compare_golden(report, golden, args.max_distance, args.exact)
+    else:
+        print(f"Warning: {args.golden} not found, skipping the pixel check")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            failures += compare_baseline(report, json.load(f), args.max_slowdown)
+
+    report["failures"] = failures
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    statuses = {}
+    for image in report["images"].values():
+        statuses[image.get("status", "unchecked")] = statuses.get(image.get("status", "unchecked"), 0) + 1
+    print(f"{report['branches']} branches at {size[0]}x{size[1]} ({'warm' if args.warm else 'cold'} layers), "
+          f"images: " + ", ".join(f"{count} {status}" for status, count in sorted(statuses.items())))
+    print(f"{'stage':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'vs base':>10}")
+    for stage, stats in report["stages"].items():
+        ratio = f"{stats['ratio']:.2f}x" if "ratio" in stats else "-"
+        print(f"{stage:<12}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+              f"{stats['max_ms']:>10.2f}{ratio:>10}")
+    print(f"{'total':<12}{report['total']['mean_ms']:>10.2f}{'':>10}{report['total']['p95_ms']:>10.2f}")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Encode time versus payload size for partner face images
+
+Renders one face per western zodiac / Chinese texture combination and
+encodes it with every output encoding, reporting the encoded size and the
+best-of-N encode time for each.
+
+Usage:
+    python benchmarks/bench_face_encoding.py --repeat 3 \\
+        --encodings png,png8,webp:80,jpeg:85
+
+An encoding is a format name optionally followed by :quality (webp/jpeg)
+or :compress_level (png/png8).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_generator import FaceGenerator, encode_image  # noqa: E402
+
+DEFAULT_ENCODINGS = "png,png:9,png8,webp:80,webp:60,jpeg:85"
+
+
+def parse_encoding(spec: str) -> Tuple[str, Dict[str, int]]:
+    """'webp:80' -> ('webp', {'quality': 80}); 'png:9' -> ('png', {'compress_level': 9})"""
+    name, _, value = spec.partition(":")
+    options = {}
+    if value:
+        options["quality" if name in ("webp", "jpeg") else "compress_level"] = int(value)
+    return name, options
+
+
+def texture_samples(generator: FaceGenerator) -> Dict[str, str]:
+    """One Chinese sign per distinct texture"""
+    samples = {}
+    for chinese, texture in generator.chinese_zodiac_textures.items():
+        samples.setdefault(texture, chinese)
+    return samples
+
+
+def bench_combo(generator: FaceGenerator, zodiac: str, chinese: str, elements: List[str],
+                colors: List[str], encodings: List[str], repeat: int) -> Dict[str, Any]:
+    image = generator._create_abstract_face(elements, zodiac, chinese, colors)
+
+    results = {}
+    for spec in encodings:
+        name, options = parse_encoding(spec)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = encode_image(image, name, **options)
+            timings.append(time.perf_counter() - start)
+        results[spec] = {"bytes": len(data), "encode_ms": min(timings) * 1000}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark partner face encodings")
+    parser.add_argument("--encodings", default=DEFAULT_ENCODINGS, help="Comma-separated encodings")
+    parser.add_argument("--zodiacs", default=None, help="Comma-separated western signs (default: all)")
+    parser.add_argument("--elements", default="Water,Metal")
+    parser.add_argument("--repeat", type=int, default=3, help="Encodes per image (best time is reported)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    generator = FaceGenerator()
+    encodings = [spec.strip() for spec in args.encodings.split(",") if spec.strip()]
+    zodiacs = args.zodiacs.split(",") if args.zodiacs else list(generator.zodiac_shapes)
+    elements = args.elements.split(",")
+    colors = ["#4CAF50", "#2196F3", "#9C27B0"]
+
+    rows = []
+    for zodiac in zodiacs:
+        for texture, chinese in texture_samples(generator).items():
+            rows.append({
+                "zodiac": zodiac,
+                "texture": texture,
+                "encodings": bench_combo(generator, zodiac, chinese, elements, colors, encodings, args.repeat)
+            })
+
+    summary = {}
+    for spec in encodings:
+        sizes = [row["encodings"][spec]["bytes"] for row in rows]
+        times = [row["encodings"][spec]["encode_ms"] for row in rows]
+        summary[spec] = {"mean_bytes": sum(sizes) / len(sizes), "max_bytes": max(sizes),
+                         "mean_encode_ms": sum(times) / len(times), "max_encode_ms": max(times)}
+
+    if args.json:
+        print(json.dumps({"rows": rows, "summary": summary}, indent=2))
+        return
+
+    header = f"{'zodiac':<13}{'texture':<10}" + "".join(f"{spec:>18}" for spec in encodings)
+    print("size KB / encode ms")
+    print(header)
+    for row in rows:
+        cells = "".join(
+            f"{row['encodings'][spec]['bytes'] / 1024:>10.1f}/{row['encodings'][spec]['encode_ms']:>7.1f}"
+            for spec in encodings
+        )
+        print(f"{row['zodiac']:<13}{row['texture']:<10}{cells}")
+    print()
+    print(f"{'mean':<23}" + "".join(
+        f"{summary[spec]['mean_bytes'] / 1024:>10.1f}/{summary[spec]['mean_encode_ms']:>7.1f}" for spec in encodings
+    ))
+
+
+if __name__ == "__main__":
+    main()
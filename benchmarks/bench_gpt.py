@@ -0,0 +1,168 @@
+"""
+Latency and throughput benchmark for the GPT enhancement path
+
+Drives enhance_fortune_reading, enhance_partner_description and
+enhance_meeting_scenarios against the local stand-in server and reports
+p50/p95/p99 latency and throughput for each.
+
+Usage:
+    python benchmarks/bench_gpt.py --requests 100 --concurrency 16 \\
+        --latency lognormal:0.8:0.4 --error-rate 0.02 --rate-limit-rate 0.05
+
+Pass --base-url to target an already running server instead of starting one.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_openai_server import MockOpenAIServer  # noqa: E402
+
+WESTERN_SIGNS = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+                 "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
+CHINESE_ANIMALS = ["Rat", "Ox", "Tiger", "Rabbit", "Dragon", "Snake",
+                   "Horse", "Goat", "Monkey", "Rooster", "Dog", "Pig"]
+ELEMENTS = ["Wood", "Fire", "Earth", "Metal", "Water"]
+TRAITS = ["Creative", "Intuitive", "Compassionate", "Grounded", "Bold", "Curious", "Loyal"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def sample_fortune(rng: random.Random, combos: int) -> Dict[str, Any]:
+    """Synthetic fortune data drawn from a limited number of sign/animal/element combos"""
+    combo = rng.randrange(combos)
+    dominant = ELEMENTS[combo % len(ELEMENTS)]
+    balance = {element: rng.randint(5, 40) for element in ELEMENTS}
+    return {
+        "western_zodiac": {"sign": WESTERN_SIGNS[combo % len(WESTERN_SIGNS)]},
+        "chinese_zodiac": {"animal": CHINESE_ANIMALS[(combo // len(WESTERN_SIGNS)) % len(CHINESE_ANIMALS)]},
+        "four_pillars": {"dominant_element": dominant},
+        "element_balance": balance,
+    }
+
+
+def sample_partner(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "compatible_elements": rng.sample(ELEMENTS, 2),
+        "personality_traits": rng.sample(TRAITS, 3),
+    }
+
+
+def sample_scenarios(rng: random.Random) -> List[Dict[str, str]]:
+    return [
+        {"location": rng.choice(["a cafe", "a bookstore", "a park"]),
+         "time": rng.choice(["morning", "afternoon", "evening"]),
+         "situation": rng.choice(["a chance encounter", "a shared umbrella", "a mistaken order"])}
+        for _ in range(3)
+    ]
+
+
+def run_workload(name: str, fn, requests: int, concurrency: int) -> Dict[str, Any]:
+    """Run fn(i) requests times across a thread pool and summarize latencies"""
+    latencies: List[float] = []
+
+    def timed(i):
+        start = time.perf_counter()
+        fn(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "workload": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies) if latencies else 0.0,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the GPT enhancement path")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per workload")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--combos", type=int, default=60,
+                        help="Distinct sign/animal/element combinations (controls cache hit rate)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the in-process response cache")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", default=None, help="Use a running server instead of starting one")
+    parser.add_argument("--latency", default="lognormal:0.5:0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url is None:
+        server = MockOpenAIServer(latency=args.latency, error_rate=args.error_rate,
+                                  rate_limit_rate=args.rate_limit_rate, rpm=args.rpm).start()
+        args.base_url = server.base_url
+
+    # 공용 클라이언트가 처음 만들어지기 전에 환경 변수를 설정해야 함
+    os.environ["OPENAI_BASE_URL"] = args.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-local-benchmark")
+
+    import gpt_enhancer
+    from gpt_enhancer import GPTEnhancer
+
+    if args.no_cache:
+        gpt_enhancer.RESPONSE_CACHE_SIZE = 0
+
+    enhancer = GPTEnhancer()
+    rng = random.Random(args.seed)
+    fortunes = [sample_fortune(rng, args.combos) for _ in range(args.requests)]
+    partners = [sample_partner(rng) for _ in range(args.requests)]
+    scenarios = [sample_scenarios(rng) for _ in range(args.requests)]
+
+    results = [
+        run_workload("enhance_fortune_reading",
+                     lambda i: enhancer.enhance_fortune_reading(fortunes[i]),
+                     args.requests, args.concurrency),
+        run_workload("enhance_partner_description",
+                     lambda i: enhancer.enhance_partner_description(fortunes[i], partners[i]),
+                     args.requests, args.concurrency),
+        run_workload("enhance_meeting_scenarios",
+                     lambda i: enhancer.enhance_meeting_scenarios(scenarios[i]),
+                     args.requests, args.concurrency),
+    ]
+    report = {"results": results, "enhancer_metrics": GPTEnhancer.get_metrics()}
+    if server is not None:
+        report["server_stats"] = dict(server.stats)
+        server.stop()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'workload':<30}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'req/s':>9}")
+    for row in results:
+        print(f"{row['workload']:<30}{row['p50']:>9.3f}{row['p95']:>9.3f}"
+              f"{row['p99']:>9.3f}{row['max']:>9.3f}{row['throughput_rps']:>9.2f}")
+    print()
+    print(json.dumps(report["enhancer_metrics"], indent=2))
+    if "server_stats" in report:
+        print(json.dumps(report["server_stats"]))
+
+
+if __name__ == "__main__":
+    main()
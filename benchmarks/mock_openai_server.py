@@ -0,0 +1,273 @@
+"""
+Local OpenAI-compatible stand-in server for load-testing the GPT path
+
+Speaks enough of the chat completions protocol for GPTEnhancer: plain and
+streaming (SSE) responses, JSON mode, usage accounting, and configurable
+latency, error and 429 injection.
+
+Usage:
+    python benchmarks/mock_openai_server.py --port 8765 --latency lognormal:0.8:0.4 \\
+        --error-rate 0.02 --rate-limit-rate 0.05
+
+Then point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, Optional
+
+LOREM = (
+    "Beneath the shifting constellations your path unfolds with quiet certainty. "
+    "The elements within you seek balance, and each season brings a new lesson. "
+    "Trust the rhythm of the stars and the wisdom of the ancient cycles."
+)
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Build a latency sampler from a spec string
+
+    Supported specs (seconds):
+        fixed:0.5
+        uniform:0.2:1.5
+        normal:0.8:0.2
+        lognormal:0.8:0.4   (median, sigma)
+
+    Args:
+        spec: Distribution spec
+
+    Returns:
+        Zero-argument function returning a latency in seconds
+    """
+    name, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if name == "fixed":
+        return lambda: values[0]
+    if name == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if name == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if name == "lognormal":
+        mu = math.log(values[0])
+        return lambda: random.lognormvariate(mu, values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockOpenAIServer:
+    """
+    Threaded stand-in for the OpenAI chat completions endpoint
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency: str = "fixed:0.0", error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, rpm: Optional[int] = None,
+                 tokens_per_second: float = 200.0):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Latency distribution spec for time-to-first-token
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit_rate: Fraction of requests answered with HTTP 429
+            rpm: Optional hard requests-per-minute cap enforced with 429s
+            tokens_per_second: Streaming speed after the first token
+        """
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self.tokens_per_second = tokens_per_second
+
+        self._lock = threading.Lock()
+        self._window = []
+        self.stats: Dict[str, int] = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _over_rpm(self) -> bool:
+        if not self.rpm:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            self._window = [t for t in self._window if now - t < 60.0]
+            if len(self._window) >= self.rpm:
+                return True
+            self._window.append(now)
+            return False
+
+    def _completion_text(self, body: Dict[str, Any]) -> str:
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens") or 200
+        words = (LOREM + " ") * 8
+        text = " ".join(words.split()[:max(1, min(max_tokens, 200) * 3 // 4)])
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            return json.dumps({"text": text, "prompt_chars": len(prompt)})
+        return text
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "gpt-4.1-mini", "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": {"message": "invalid JSON", "type": "invalid_request_error"}})
+                    return
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+                    return
+
+                server._count("requests")
+                if server._over_rpm() or random.random() < server.rate_limit_rate:
+                    server._count("rate_limited")
+                    self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                                    {"retry-after": "1"})
+                    return
+
+                time.sleep(server.sample_latency())
+
+                if random.random() < server.error_rate:
+                    server._count("errors")
+                    self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+                    return
+
+                text = server._completion_text(body)
+                prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4 + 1
+                completion_tokens = len(text) // 4 + 1
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                created = int(time.time())
+                model = body.get("model", "gpt-4.1-mini")
+                server._count("ok")
+
+                if body.get("stream"):
+                    self._stream(completion_id, created, model, text, prompt_tokens, completion_tokens,
+                                 (body.get("stream_options") or {}).get("include_usage", False))
+                    return
+
+                self._send_json(200, {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens
+                    }
+                })
+
+            def _stream(self, completion_id, created, model, text, prompt_tokens, completion_tokens, include_usage):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def emit(payload):
+                    self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+                emit({**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]})
+                delay = 1.0 / server.tokens_per_second if server.tokens_per_second else 0.0
+                for word in text.split(" "):
+                    emit({**base, "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]})
+                    if delay:
+                        time.sleep(delay)
+                emit({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                if include_usage:
+                    emit({**base, "choices": [], "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens
+                    }})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:0.8:0.4",
+                        help="fixed:S | uniform:LO:HI | normal:MU:SD | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=None)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.host, args.port, args.latency, args.error_rate,
+                              args.rate_limit_rate, args.rpm, args.tokens_per_second)
+    print(f"Mock OpenAI server listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import time
+import threading
+from typing import Dict, Any
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for upstream API calls
+
+    closed    -> calls go through; consecutive failures are counted
+    open      -> calls are rejected until the cooldown has passed
+    half_open -> a single trial call decides whether to close or re-open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures before the breaker opens
+            reset_timeout: Seconds to stay open before allowing a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_thread = None
+
+        # 메트릭 카운터
+        self._successes = 0
+        self._failures = 0
+        self._rejections = 0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def _refresh_state(self) -> None:
+        """Move from open to half-open once the cooldown has elapsed (lock held)"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may go upstream
+
+        Returns:
+            True if the call is allowed, False if it should fall back immediately
+        """
+        with self._lock:
+            self._refresh_state()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                self._trial_thread = threading.get_ident()
+                return True
+            self._rejections += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._successes += 1
+            self._consecutive_failures = 0
+            self._state = self.CLOSED
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """
+        End a call without recording an outcome (e.g. a rejected request or
+        no rate-limit capacity), so a half-open trial does not stay in flight
+
+        Only the thread that was granted the trial releases it; for any other
+        call this is a no-op, so it is safe to call from a finally block.
+        """
+        with self._lock:
+            if self._trial_in_flight and self._trial_thread == threading.get_ident():
+                self._trial_in_flight = False
+                self._trial_thread = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of breaker state and counters
+
+        Returns:
+            Dictionary suitable for logging or a metrics endpoint
+        """
+        with self._lock:
+            self._refresh_state()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "successes": self._successes,
+                "failures": self._failures,
+                "rejections": self._rejections,
+                "times_opened": self._times_opened,
+                "seconds_until_trial": (
+                    max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+                    if self._state == self.OPEN else 0.0
+                )
+            }
@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import time
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from face_generator import FaceGenerator, IMAGE_FORMATS, RENDER_SIZE
+from face_store import FaceStore
+
+ELEMENTS = ["Wood", "Fire", "Earth", "Metal", "Water"]
+
+# 작업자 프로세스마다 출력 디렉터리별 저장소 하나 (생성자가 디렉터리 전체를 훑으므로 청크마다 만들지 않음)
+_worker_stores: Dict[str, FaceStore] = {}
+
+
+def enumerate_profiles(generator: Optional[FaceGenerator] = None,
+                       palettes: Optional[List[List[str]]] = None) -> Iterable[Dict[str, Any]]:
+    """
+    Every combination of face inputs: ordered element pairs x western
+    zodiac x Chinese sign x palette
+
+    Args:
+        generator: Source of the zodiac and Chinese sign tables
+        palettes: Aura palettes (default: only the generator's default palette)
+
+    Yields:
+        Partner profile dictionaries accepted by generate_partner_face
+    """
+    generator = generator or FaceGenerator()
+    for palette in palettes or [[]]:
+        for elements in itertools.permutations(ELEMENTS, 2):
+            for zodiac in generator.zodiac_shapes:
+                for chinese in generator.chinese_zodiac_textures:
+                    profile = {
+                        "compatible_elements": list(elements),
+                        "compatible_zodiacs": [zodiac],
+                        "compatible_chinese": [chinese],
+                    }
+                    if palette:
+                        profile["aura_colors"] = palette
+                    yield profile
+
+
+def load_profiles(path: str) -> List[Dict[str, Any]]:
+    """
+    Read partner profiles from a JSON list or a JSONL file
+
+    Each profile needs only the face inputs (compatible_elements,
+    compatible_zodiacs, compatible_chinese, aura_colors).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _render_chunk(task: Tuple[List[Dict[str, Any]], Dict[str, Any], str, Optional[Tuple[int, int]]]) -> Dict[str, Any]:
+    """
+    Worker: render and store one chunk of profiles
+
+    Returns:
+        Counts, busy seconds and manifest rows for the chunk
+    """
+    profiles, options, output_dir, size = task
+    generator = FaceGenerator(**options)
+    store = _worker_stores.get(output_dir)
+    if store is None:
+        store = _worker_stores[output_dir] = FaceStore(output_dir, max_bytes=sys.maxsize)
+    extension, _ = IMAGE_FORMATS[generator.image_format]
+
+    started = time.perf_counter()
+    result = {"rendered": 0, "skipped": 0, "failed": 0, "manifest": []}
+    for profile in profiles:
+        key = generator.image_key(profile, size)
+        # 재개 가능: 다른 작업자나 이전 실행이 이미 만든 파일은 건너뜀
+        if os.path.exists(store.path(key, extension)):
+            result["skipped"] += 1
+            continue
+        try:
+            face = generator.generate_partner_face({}, profile, as_bytes=True, size=size)
+        except Exception as e:
+            print(f"Error rendering face for {profile}: {e}")
+            result["failed"] += 1
+            continue
+        store.put(key, face["image"], extension)
+        elements, zodiac, chinese, colors = generator.face_inputs(profile)
+        result["manifest"].append({"key": key, "file": f"{key}.{extension}", "elements": elements,
+                                   "zodiac": zodiac, "chinese": chinese, "colors": colors})
+        result["rendered"] += 1
+    result["busy_seconds"] = time.perf_counter() - started
+    return result
+
+
+def prerender(profiles: Iterable[Dict[str, Any]], output_dir: str, options: Optional[Dict[str, Any]] = None,
+              size: Optional[Tuple[int, int]] = None, workers: Optional[int] = None,
+              chunk_size: int = 16, manifest_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Render profiles into a content-addressed directory with a process pool
+
+    Profiles whose file already exists are skipped before dispatch, so an
+    interrupted run picks up where it stopped.
+
+    Args:
+        profiles: Partner profiles to render
+        output_dir: Output directory (file name = image key + extension)
+        options: FaceGenerator keyword arguments (image_format, quality, ...)
+        size: Render size (default RENDER_SIZE)
+        workers: Worker processes (default: CPU count)
+        chunk_size: Profiles per task sent to a worker
+        manifest_path: JSONL file to append rendered keys and inputs to
+
+    Returns:
+        Summary with counts, wall time and renders per second (per core)
+    """
+    workers = workers or os.cpu_count() or 1
+    generator = FaceGenerator(**(options or {}))
+    # 기본값(환경 변수)까지 확정된 설정을 작업자에게 넘겨 키와 인코딩이 어긋나지 않게 함
+    options = generator.options
+    extension, _ = IMAGE_FORMATS[generator.image_format]
+    os.makedirs(output_dir, exist_ok=True)
+
+    # 이미 렌더링된 키는 작업자에게 보내지 않음 (같은 키가 여러 번 나오면 한 번만)
+    pending, seen, requested = [], set(), 0
+    for profile in profiles:
+        requested += 1
+        key = generator.image_key(profile, size)
+        if key in seen or os.path.exists(os.path.join(output_dir, f"{key}.{extension}")):
+            continue
+        seen.add(key)
+        pending.append(profile)
+
+    summary = {"requested": requested, "pending": len(pending), "rendered": 0, "skipped": requested - len(pending),
+               "failed": 0, "workers": workers, "wall_seconds": 0.0, "busy_seconds": 0.0}
+    chunks = [(pending[i:i + chunk_size], options, output_dir, size) for i in range(0, len(pending), chunk_size)]
+
+    started = time.perf_counter()
+    manifest = open(manifest_path, "a", encoding="utf-8") if manifest_path else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            for result in executor.map(_render_chunk, chunks):
+                summary["rendered"] += result["rendered"]
+                summary["skipped"] += result["skipped"]
+                summary["failed"] += result["failed"]
+                summary["busy_seconds"] += result["busy_seconds"]
+                if manifest is not None:
+                    for row in result["manifest"]:
+                        manifest.write(json.dumps(row) + "\n")
+                    manifest.flush()
+    finally:
+        if manifest is not None:
+            manifest.close()
+
+    wall = time.perf_counter() - started
+    summary["wall_seconds"] = wall
+    summary["renders_per_second"] = summary["rendered"] / wall if wall > 0 else 0.0
+    summary["renders_per_second_per_core"] = summary["renders_per_second"] / workers
+    summary["seconds_per_render"] = summary["busy_seconds"] / summary["rendered"] if summary["rendered"] else 0.0
+    return summary
+
+
+def main():
+    """Pre-render partner faces for a gallery or to warm the face store after a deploy"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batch pre-render partner faces")
+    parser.add_argument("--output", default=os.getenv("FACE_STORE_DIR") or "face_store",
+                        help="Content-addressed output directory (default: the app's face store)")
+    parser.add_argument("--profiles", default=None, help="JSON or JSONL file of partner profiles (default: all combinations)")
+    parser.add_argument("--palettes", default=None, help="JSON list of aura palettes to enumerate")
+    parser.add_argument("--format", default=None, choices=sorted(IMAGE_FORMATS), help="Image format (default FACE_IMAGE_FORMAT)")
+    parser.add_argument("--quality", type=int, default=None)
+    parser.add_argument("--size", default=None, help="WIDTHxHEIGHT (default %dx%d)" % RENDER_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--limit", type=int, default=None, help="Only the first N profiles")
+    parser.add_argument("--manifest", default=None, help="Append rendered keys and inputs to this JSONL file")
+    args = parser.parse_args()
+
+    options = {key: value for key, value in (("image_format", args.format), ("quality", args.quality)) if value is not None}
+    size = tuple(int(value) for value in args.size.lower().split("x")) if args.size else None
+    if args.profiles:
+        profiles = load_profiles(args.profiles)
+    else:
+        palettes = json.loads(args.palettes) if args.palettes else None
+        profiles = enumerate_profiles(palettes=palettes)
+    if args.limit is not None:
+        profiles = itertools.islice(profiles, args.limit)
+
+    summary = prerender(profiles, args.output, options, size, args.workers, args.chunk_size, args.manifest)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
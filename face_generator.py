@@ -1,10 +1,455 @@
 import numpy as np
-import random
 from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import io
-import base64
+import os
+import json
 import math
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+
+from face_store import get_face_store
+from face_svg import SvgCanvas, svg_color
+
+# 렌더링 크기: 모든 도형은 캔버스 크기에 대한 비율로 정의되어 어떤 크기에서도 같은 모습
+RENDER_SIZE = (500, 600)
+THUMBNAIL_SIZE = (100, 120)
+
+# Aura: concentric rings whose diameter shrinks by AURA_RING_STEP of the
+# shorter canvas side per ring
+AURA_RINGS = 10
+AURA_RING_STEP = 0.04
+
+
+def _stroke(width: int, pixels: float) -> int:
+    """Line width for a canvas, given in pixels of the reference canvas"""
+    return max(1, round(pixels * width / RENDER_SIZE[0]))
+
+
+def _face_center(width: int, height: int) -> tuple:
+    """Center of the face: horizontally centered, 5/12 of the way down"""
+    return width // 2, round(height * 5 / 12)
+
+
+def _flat_points(xs: np.ndarray, ys: np.ndarray) -> Tuple[float, ...]:
+    """Interleave coordinate arrays into the flat [x0, y0, x1, y1, ...] form draw.line accepts"""
+    return tuple(np.column_stack((xs, ys)).ravel().tolist())
+
+
+@lru_cache(maxsize=64)
+def _arc_polylines(box: Tuple[float, float, float, float], start: float, end: float,
+                   spread: float, count: int, stroke: int) -> Tuple[Tuple[float, ...], ...]:
+    """
+    Concentric elliptical arcs as polylines (cached; the boxes are derived
+    from the canvas size, so this is effectively one entry per size)
+    
+    Args:
+        box: Bounding box of the innermost arc, as for draw.arc
+        start, end: Angles in degrees, clockwise from 3 o'clock like draw.arc
+        spread: Growth of each further arc's box on every side
+        count: Number of arcs
+        stroke: Line width; the curve runs through the middle of the stroke
+            so it covers the same pixels as draw.arc
+    """
+    x0, y0, x1, y1 = box
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    grow = spread * np.arange(count)[:, None]
+    rx = (x1 - x0) / 2 + grow - (stroke - 1) / 2
+    ry = (y1 - y0) / 2 + grow - (stroke - 1) / 2
+    # 약 2px 간격의 선분 (가장 큰 호 기준)
+    sweep = math.radians(end - start)
+    segments = max(8, int(sweep * max(rx.max(), ry.max()) / 2))
+    angles = np.linspace(math.radians(start), math.radians(end), segments + 1)
+    xs = cx + rx * np.cos(angles)
+    ys = cy + ry * np.sin(angles)
+    return tuple(_flat_points(x, y) for x, y in zip(xs, ys))
+
+
+@lru_cache(maxsize=8)
+def _wave_polyline(width: int, height: int) -> Tuple[float, ...]:
+    """Wavy mouth of the water signs as one polyline (cached per canvas size)"""
+    center_x, center_y = _face_center(width, height)
+    mouth_y = center_y + height * 0.25
+    mouth_width = width * 0.3
+    mouth_height = height * 0.05
+    # 파장은 캔버스 너비에 비례 (기준 캔버스에서 100px당 1 rad)
+    # 입 너비(실수)를 정수 픽셀 수로 잘라 픽셀마다 한 점씩 샘플링
+    samples = int(mouth_width)
+    offsets = np.arange(samples, dtype=np.float64)
+    xs = center_x - mouth_width / 2 + offsets
+    ys = mouth_y + np.sin(offsets * 100 / width) * mouth_height
+    return _flat_points(xs, ys)
+
+
+@contextmanager
+def _stage(timings: Optional[Dict[str, float]], name: str):
+    """Add the time spent in the block to timings[name] (no-op without timings)"""
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
+@lru_cache(maxsize=8)
+def _aura_ring_field(width: int, height: int) -> np.ndarray:
+    """
+    Ring position of every pixel for a canvas size (cached, read-only)
+    
+    0 at the outer edge of the aura, +1 per ring towards the center and
+    negative outside the aura. Matches the pixel coverage of the ellipses
+    the aura used to be drawn with.
+    """
+    ys, xs = np.ogrid[:height, :width]
+    distance = np.hypot(xs - width // 2, ys - height // 2)
+    ring_step = min(width, height) * AURA_RING_STEP
+    field = ((min(width, height) / 2 + 0.5 - distance) / (ring_step / 2)).astype(np.float32)
+    field.setflags(write=False)
+    return field
+
+
+@lru_cache(maxsize=8)
+def _aura_ring_index(width: int, height: int) -> np.ndarray:
+    """Innermost ring covering each pixel, AURA_RINGS outside the aura (cached, read-only)"""
+    field = _aura_ring_field(width, height)
+    index = np.where(field >= 0, np.minimum(np.floor(field), AURA_RINGS - 1), AURA_RINGS).astype(np.uint8)
+    index.setflags(write=False)
+    return index
+
+
+
+@lru_cache(maxsize=8)
+def _aura_levels(width: int, height: int, smooth: bool) -> tuple:
+    """
+    Aura position of every pixel quantized to a small number of levels, so
+    a per-level lookup table can recolor the whole aura (cached, read-only)
+    
+    Returns:
+        (level index per pixel with len(positions) outside the aura,
+         ring position of each level)
+    """
+    if not smooth:
+        return _aura_ring_index(width, height), np.arange(AURA_RINGS, dtype=np.float64)
+    # 부드러운 오라: 링당 8단계로 양자화 (가장자리 페이드도 위치의 함수라 LUT에 포함 가능)
+    steps = 8
+    field = _aura_ring_field(width, height)
+    levels = (AURA_RINGS - 1) * steps + 1
+    index = np.where(field >= 0, np.rint(np.clip(field, 0, AURA_RINGS - 1) * steps), levels).astype(np.uint8)
+    index.setflags(write=False)
+    return index, np.arange(levels) / steps
+
+# Element effects, each applied in list order as (operation, argument):
+#   blend   - blend towards a flat tint (rgb, weight)
+#   glow    - blend towards white with a faint tinted disc
+#             (rgba, radius as a fraction of the canvas width, weight)
+#   color   - ImageEnhance.Color-style saturation factor
+#   blur    - 3x3 Gaussian blur sigma, in pixels of the reference canvas
+#   sharpen - ImageEnhance.Sharpness-style factor
+ELEMENT_EFFECTS = {
+    'Fire': [('glow', ((255, 100, 0, 10), 0.2, 0.2))],
+    'Water': [('blur', 0.5), ('blend', ((230, 240, 255), 0.1))],
+    'Earth': [('color', 1.2), ('blend', ((255, 250, 240), 0.1))],
+    'Metal': [('sharpen', 1.5), ('blend', ((245, 245, 245), 0.1))],
+    'Wood': [('blend', ((240, 255, 240), 0.1)), ('color', 1.1)],
+}
+
+# ITU-R 601-2 luma, as used by PIL for RGB -> L
+_LUMA = np.array([0.299, 0.587, 0.114])
+# PIL ImageFilter.SMOOTH, which ImageEnhance.Sharpness blends against
+_SMOOTH_KERNEL = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]]) / 13.0
+
+
+def _gaussian_kernel(sigma: float) -> np.ndarray:
+    taps = np.exp(-np.arange(-1, 2) ** 2 / (2 * sigma ** 2))
+    taps /= taps.sum()
+    return np.outer(taps, taps)
+
+
+def _convolve_kernels(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Full 2-D convolution of two small kernels"""
+    out = np.zeros((a.shape[0] + b.shape[0] - 1, a.shape[1] + b.shape[1] - 1))
+    for (i, j), weight in np.ndenumerate(a):
+        out[i:i + b.shape[0], j:j + b.shape[1]] += weight * b
+    return out
+
+
+@lru_cache(maxsize=64)
+def _effect_pipeline(elements: tuple, scale: float = 1.0) -> Dict[str, Any]:
+    """
+    Fold a sequence of element effects into one affine color transform
+    
+    Every effect is linear per pixel, so the whole chain reduces to
+    out = matrix @ rgb + offset (+ glow inside the Fire disc), followed by
+    a single convolution for any blur/sharpen steps (convolutions commute with the
+    per-pixel part up to rounding at each step).
+    
+    Args:
+        elements: Element names in application order
+        scale: Canvas width relative to the reference canvas
+        
+    Returns:
+        Dictionary with the color matrix, the matrix used inside the glow disc
+        (or None), glow_radius (fraction of the width) and kernel (an
+        ImageFilter.Kernel or None)
+    """
+    matrix = np.eye(3)
+    offset = np.zeros(3)
+    glow = np.zeros(3)
+    glow_radius = 0
+    kernel = None
+    
+    for element in elements:
+        for operation, argument in ELEMENT_EFFECTS.get(element, []):
+            if operation == 'blend':
+                tint, weight = argument
+                matrix, offset, glow = (1 - weight) * matrix, (1 - weight) * offset + weight * np.array(tint), (1 - weight) * glow
+            elif operation == 'glow':
+                (r, g, b, alpha), glow_radius, weight = argument
+                white = np.full(3, 255.0)
+                matrix, offset = (1 - weight) * matrix, (1 - weight) * offset + weight * white
+                glow = (1 - weight) * glow + weight * (np.array([r, g, b]) - white) * alpha / 255
+            elif operation == 'color':
+                saturation = (1 - argument) * np.outer(np.ones(3), _LUMA) + argument * np.eye(3)
+                matrix, offset, glow = saturation @ matrix, saturation @ offset, saturation @ glow
+            elif operation in ('blur', 'sharpen'):
+                if operation == 'blur':
+                    step = _gaussian_kernel(argument * scale)
+                else:
+                    identity = np.zeros((3, 3))
+                    identity[1, 1] = 1
+                    step = argument * identity + (1 - argument) * _SMOOTH_KERNEL
+                kernel = step if kernel is None else _convolve_kernels(kernel, step)
+    
+    filter_kernel = None
+    if kernel is not None:
+        size = kernel.shape[0]
+        filter_kernel = ImageFilter.Kernel((size, size), kernel.flatten().tolist(), scale=1)
+    return {
+        'matrix': _color_matrix(matrix, offset),
+        'glow_matrix': _color_matrix(matrix, offset + glow) if glow_radius and glow.any() else None,
+        'glow_radius': glow_radius,
+        'kernel': filter_kernel
+    }
+
+
+@lru_cache(maxsize=8)
+def _disc_mask(radius: int) -> Image.Image:
+    """L-mode mask of a disc with the given radius, 2 * radius + 1 pixels square"""
+    size = 2 * radius + 1
+    mask = Image.new('L', (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size - 1, size - 1), fill=255)
+    return mask
+
+
+def _color_matrix(matrix: np.ndarray, offset: np.ndarray) -> tuple:
+    """3x3 matrix and offset as the 12-tuple accepted by Image.convert"""
+    return tuple(float(value) for value in np.hstack([matrix, offset[:, None]]).flatten())
+
+
+# 출력 인코딩: 이름 -> (파일 확장자, MIME 타입)
+#   png  - lossless, compress_level 0-9
+#   png8 - palette-quantized PNG (quantize_colors), compress_level 0-9
+#   webp - lossy WebP, quality 0-100
+#   jpeg - lossy JPEG, quality 0-95
+#   svg  - vector markup drawn by the SVG backend (no rasterization)
+IMAGE_FORMATS = {
+    'png': ('png', 'image/png'),
+    'png8': ('png', 'image/png'),
+    'webp': ('webp', 'image/webp'),
+    'jpeg': ('jpg', 'image/jpeg'),
+    'svg': ('svg', 'image/svg+xml'),
+}
+
+# SVG 대비 필터의 기준 밝기: PIL Contrast는 이미지 평균 밝기를 기준으로 하지만
+# 벡터 출력에서는 알 수 없으므로 일반적인 얼굴 이미지의 평균값을 사용
+SVG_CONTRAST_PIVOT = 0.93
+
+
+def encode_image(image: Image.Image, image_format: str = 'png', quality: int = 85,
+                 compress_level: int = 6, quantize_colors: int = 64) -> bytes:
+    """
+    Encode a face image
+    
+    Args:
+        image: RGB image
+        image_format: One of IMAGE_FORMATS
+        quality: Quality for webp and jpeg
+        compress_level: zlib level for png and png8
+        quantize_colors: Palette size for png8
+        
+    Returns:
+        Encoded image bytes
+    """
+    buffered = io.BytesIO()
+    if image_format == 'png':
+        image.save(buffered, format='PNG', compress_level=compress_level)
+    elif image_format == 'png8':
+        palette = image.quantize(colors=quantize_colors, method=Image.Quantize.FASTOCTREE)
+        palette.save(buffered, format='PNG', compress_level=compress_level)
+    elif image_format == 'webp':
+        image.save(buffered, format='WEBP', quality=quality, method=4)
+    elif image_format == 'jpeg':
+        image.save(buffered, format='JPEG', quality=quality, optimize=True)
+    else:
+        raise ValueError(f"Unknown image format: {image_format}")
+    return buffered.getvalue()
+
+
+
+# 애니메이션 오라: 정지 이미지를 한 번 렌더링하고 프레임마다 오라 링 불투명도와
+# 불 원소의 빛만 배열 연산으로 다시 계산
+#   webp - animated WebP, quality 0-100
+#   apng - animated PNG (lossless); only the changed region of each frame is stored
+ANIMATION_FORMATS = {
+    'webp': ('webp', 'image/webp'),
+    'apng': ('png', 'image/apng'),
+}
+ANIMATION_MAX_FRAMES = int(os.getenv("FACE_ANIMATION_MAX_FRAMES", "24"))
+ANIMATION_MAX_PIXELS = int(os.getenv("FACE_ANIMATION_MAX_PIXELS", str(RENDER_SIZE[0] * RENDER_SIZE[1])))
+# Fraction of each ring's opacity that pulses, and peak glow relative to the still
+AURA_PULSE_DEPTH = 0.6
+GLOW_PULSE_GAIN = 6.0
+# 작은 밝기 변화가 텍스처 단계를 거치며 받는 배율 (패턴 혼합 0.9, 대비 0.9/1.2)
+TEXTURE_GAIN = {
+    'detailed': 0.9, 'striped': 0.9, 'scaled': 0.9, 'textured': 0.9,
+    'soft': 0.9, 'smooth': 0.9,
+    'strong': 1.2, 'loyal': 1.2,
+}
+
+
+def encode_animation(frames: List[Image.Image], animation_format: str = 'webp',
+                     duration: int = 120, quality: int = 85) -> bytes:
+    """
+    Encode frames as a looping animation
+    
+    Both encoders store frame deltas: libwebp emits sub-frame rectangles and
+    Pillow's APNG writer crops each frame to the region that changed.
+    
+    Args:
+        frames: RGB frames of equal size
+        animation_format: One of ANIMATION_FORMATS
+        duration: Milliseconds per frame
+        quality: Quality for webp
+        
+    Returns:
+        Encoded animation bytes
+    """
+    buffered = io.BytesIO()
+    if animation_format == 'webp':
+        # method 2: 정지 이미지(method 4)보다 인코딩이 약 2배 빠르고 크기는 5% 정도만 커짐
+        frames[0].save(buffered, format='WEBP', save_all=True, append_images=frames[1:],
+                       duration=duration, loop=0, quality=quality, method=2)
+    elif animation_format == 'apng':
+        frames[0].save(buffered, format='PNG', save_all=True, append_images=frames[1:],
+                       duration=duration, loop=0, disposal=0, blend=0)
+    else:
+        raise ValueError(f"Unknown animation format: {animation_format}")
+    return buffered.getvalue()
+
+# 렌더링된 얼굴 이미지 캐시: 항목 수가 아니라 총 바이트 수로 제한
+FACE_CACHE_BYTES = int(os.getenv("FACE_CACHE_BYTES", str(32 * 1024 * 1024)))
+_face_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_face_cache_size = 0
+_face_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_face_cache_lock = threading.Lock()
+
+
+def face_key(elements: List[str], zodiac: str, chinese: str, colors: List[str],
+             seed: Optional[int] = None, smooth_aura: bool = False,
+             size: Tuple[int, int] = RENDER_SIZE) -> str:
+    """
+    Content key of a rendered face
+    
+    Args:
+        elements: Compatible elements, in order
+        zodiac: Western zodiac sign driving the face shape
+        chinese: Chinese zodiac sign driving the texture
+        colors: Aura palette
+        seed: Generator seed mixed into the texture noise
+        smooth_aura: Whether the aura uses the smooth falloff
+        size: Render size (width, height)
+        
+    Returns:
+        Hex SHA-256 digest of the render inputs
+    """
+    payload = json.dumps([list(elements), zodiac, chinese, list(colors), seed, smooth_aura, list(size)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _face_cache_get(key: str) -> Optional[bytes]:
+    with _face_cache_lock:
+        data = _face_cache.get(key)
+        if data is None:
+            _face_cache_stats["misses"] += 1
+            return None
+        _face_cache.move_to_end(key)
+        _face_cache_stats["hits"] += 1
+        return data
+
+
+def _face_cache_put(key: str, data: bytes) -> None:
+    global _face_cache_size
+    if len(data) > FACE_CACHE_BYTES:
+        return
+    with _face_cache_lock:
+        previous = _face_cache.pop(key, None)
+        if previous is not None:
+            _face_cache_size -= len(previous)
+        _face_cache[key] = data
+        _face_cache_size += len(data)
+        while _face_cache_size > FACE_CACHE_BYTES:
+            _, evicted = _face_cache.popitem(last=False)
+            _face_cache_size -= len(evicted)
+            _face_cache_stats["evictions"] += 1
+
+
+# 얼굴 레이어 캐시: 각 레이어는 자신을 결정하는 입력만으로 키를 만듦
+LAYER_CACHE_BYTES = int(os.getenv("FACE_LAYER_CACHE_BYTES", str(64 * 1024 * 1024)))
+_layer_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_layer_cache_size = 0
+_layer_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_layer_cache_lock = threading.Lock()
+
+
+def _layer_bytes(entry: tuple) -> int:
+    image = entry[0]
+    return image.width * image.height * len(image.getbands()) if image is not None else 0
+
+
+def _layer_cache_get(key: tuple) -> Optional[tuple]:
+    with _layer_cache_lock:
+        entry = _layer_cache.get(key)
+        if entry is None:
+            _layer_cache_stats["misses"] += 1
+            return None
+        _layer_cache.move_to_end(key)
+        _layer_cache_stats["hits"] += 1
+        return entry
+
+
+def _layer_cache_put(key: tuple, entry: tuple) -> None:
+    global _layer_cache_size
+    size = _layer_bytes(entry)
+    if size > LAYER_CACHE_BYTES:
+        return
+    with _layer_cache_lock:
+        previous = _layer_cache.pop(key, None)
+        if previous is not None:
+            _layer_cache_size -= _layer_bytes(previous)
+        _layer_cache[key] = entry
+        _layer_cache_size += size
+        while _layer_cache_size > LAYER_CACHE_BYTES:
+            _, evicted = _layer_cache.popitem(last=False)
+            _layer_cache_size -= _layer_bytes(evicted)
+            _layer_cache_stats["evictions"] += 1
+
 
 class FaceGenerator:
     """
@@ -15,7 +460,30 @@ class FaceGenerator:
     without using external ML APIs for actual face generation.
     """
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, smooth_aura: bool = False,
+                 image_format: Optional[str] = None, quality: Optional[int] = None,
+                 compress_level: int = 6, quantize_colors: int = 64):
+        """
+        Args:
+            seed: Extra seed mixed into the texture noise; the noise is
+                otherwise derived from the render inputs, so identical
+                inputs always produce identical (cacheable) images
+            smooth_aura: Blend smoothly between aura rings instead of hard steps
+            image_format: png, png8, webp, jpeg or svg (default FACE_IMAGE_FORMAT
+                or png); svg skips rasterization, the others use PIL
+            quality: webp/jpeg quality (default FACE_IMAGE_QUALITY or 85)
+            compress_level: zlib level for png/png8
+            quantize_colors: Palette size for png8
+        """
+        self.seed = seed
+        self.smooth_aura = smooth_aura
+        self.image_format = image_format or os.getenv("FACE_IMAGE_FORMAT", "png")
+        if self.image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {self.image_format}")
+        self.quality = quality if quality is not None else int(os.getenv("FACE_IMAGE_QUALITY", "85"))
+        self.compress_level = compress_level
+        self.quantize_colors = quantize_colors
+        
         # 얼굴 생성을 위한 기본 설정
         self.face_shapes = ['oval', 'round', 'square', 'heart', 'oblong']
         self.eye_shapes = ['almond', 'round', 'hooded', 'monolid', 'upturned']
@@ -97,119 +565,572 @@ class FaceGenerator:
             'Pig': 'rounded'
         }
         
-    def generate_partner_face(self, user_fortune: Dict, partner_profile: Dict) -> Dict[str, Any]:
+    def generate_partner_face(self, user_fortune: Dict, partner_profile: Dict,
+                              as_bytes: bool = False,
+                              size: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
         """
         Generate a visual representation of the ideal partner's face
         
         Args:
             user_fortune: User's fortune data
             partner_profile: Partner compatibility data
+            as_bytes: Return the encoded bytes instead of a store path
+            size: Render size (width, height), e.g. THUMBNAIL_SIZE for
+                gallery and list views (default RENDER_SIZE)
             
         Returns:
-            Dictionary containing the image and description
+            Dictionary containing the image and description. 'image' is the
+            path of the encoded image in the shared face store (raw bytes if
+            the store is disabled or as_bytes is set), 'image_key' its
+            content key and 'mime_type' its encoding
         """
-        # Extract relevant attributes
-        compatible_elements = partner_profile.get('compatible_elements', ['Wood', 'Water'])
-        compatible_zodiacs = partner_profile.get('compatible_zodiacs', ['Libra'])
-        compatible_chinese = partner_profile.get('compatible_chinese', ['Dragon'])
-        aura_colors = partner_profile.get('aura_colors', [])
-        
-        # Default values if any are missing
-        if not compatible_elements:
-            compatible_elements = ['Wood', 'Water']
-        if not compatible_zodiacs:
-            compatible_zodiacs = ['Libra']
-        if not compatible_chinese:
-            compatible_chinese = ['Dragon']
-        if not aura_colors:
-            aura_colors = ['#4CAF50', '#2196F3', '#9C27B0']
-        
-        # Generate image
-        image = self._create_abstract_face(
-            compatible_elements,
-            compatible_zodiacs[0] if compatible_zodiacs else 'Libra',
-            compatible_chinese[0] if compatible_chinese else 'Dragon',
-            aura_colors
-        )
+        compatible_elements, zodiac, chinese, aura_colors = self.face_inputs(partner_profile)
         
-        # Convert image to base64
-        buffered = io.BytesIO()
-        image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        # Serve repeat renders from the shared store or the in-memory cache
+        size = tuple(size or RENDER_SIZE)
+        key = self.image_key(partner_profile, size)
+        extension, mime_type = IMAGE_FORMATS[self.image_format]
+        store = get_face_store() if not as_bytes else None
+        image_ref = store.get(key, extension) if store is not None else None
+        
+        if image_ref is None:
+            data = _face_cache_get(key)
+            if data is None:
+                if self.image_format == 'svg':
+                    data = self._create_svg_face(compatible_elements, zodiac, chinese,
+                                                 aura_colors, size).encode('utf-8')
+                else:
+                    image = self._create_abstract_face(compatible_elements, zodiac, chinese, aura_colors, size)
+                    data = encode_image(image, self.image_format, self.quality,
+                                        self.compress_level, self.quantize_colors)
+                _face_cache_put(key, data)
+            
+            # 디스크에 한 번만 쓰고 모든 세션이 경로로 공유
+            image_ref = store.put(key, data, extension) if store is not None else data
         
         # Generate description
-        aura_description = self._generate_aura_description(
-            compatible_elements, 
-            compatible_zodiacs[0] if compatible_zodiacs else 'Libra',
-            compatible_chinese[0] if compatible_chinese else 'Dragon'
-        )
+        aura_description = self._generate_aura_description(compatible_elements, zodiac, chinese)
         
         return {
-            'image': img_str,
+            'image': image_ref,
+            'image_key': key,
+            'mime_type': mime_type,
             'aura_description': aura_description,
             'color_palette': aura_colors
         }
         
-    def _create_abstract_face(self, elements: List[str], zodiac: str, 
-                             chinese: str, colors: List[str]) -> Image.Image:
-        """Generate an abstract face image"""
-        # Create a white background
-        width, height = 500, 600
-        image = Image.new('RGB', (width, height), 'white')
-        draw = ImageDraw.Draw(image)
+    def stored_partner_face(self, partner_profile: Dict,
+                            size: Optional[Tuple[int, int]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Face result for a profile if its image is in the shared store, without rendering
+        
+        Args:
+            partner_profile: Partner compatibility data
+            size: Render size (default RENDER_SIZE)
+            
+        Returns:
+            The same dictionary as generate_partner_face, or None if the
+            store is disabled or does not hold the image
+        """
+        store = get_face_store()
+        if store is None:
+            return None
+        key = self.image_key(partner_profile, size)
+        extension, mime_type = IMAGE_FORMATS[self.image_format]
+        image_ref = store.get(key, extension)
+        if image_ref is None:
+            return None
+        compatible_elements, zodiac, chinese, aura_colors = self.face_inputs(partner_profile)
+        return {
+            'image': image_ref,
+            'image_key': key,
+            'mime_type': mime_type,
+            'aura_description': self._generate_aura_description(compatible_elements, zodiac, chinese),
+            'color_palette': aura_colors
+        }
+        
+    def generate_animated_face(self, user_fortune: Dict, partner_profile: Dict,
+                               frames: int = 8, duration: int = 120,
+                               animation_format: str = 'webp', as_bytes: bool = False,
+                               size: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        """
+        Generate the partner's face with a pulsing aura as a looping animation
+        
+        Args:
+            user_fortune: User's fortune data
+            partner_profile: Partner compatibility data
+            frames: Frames per pulse (2 to ANIMATION_MAX_FRAMES)
+            duration: Milliseconds per frame
+            animation_format: One of ANIMATION_FORMATS
+            as_bytes: Return the encoded bytes instead of a store path
+            size: Render size, at most ANIMATION_MAX_PIXELS pixels (default RENDER_SIZE)
+            
+        Returns:
+            Dictionary with the same keys as generate_partner_face
+        """
+        if animation_format not in ANIMATION_FORMATS:
+            raise ValueError(f"Unknown animation format: {animation_format}")
+        if not 2 <= frames <= ANIMATION_MAX_FRAMES:
+            raise ValueError(f"Animation frames must be between 2 and {ANIMATION_MAX_FRAMES}: {frames}")
+        size = tuple(size or RENDER_SIZE)
+        if size[0] * size[1] > ANIMATION_MAX_PIXELS:
+            raise ValueError(f"Animation size {size[0]}x{size[1]} exceeds {ANIMATION_MAX_PIXELS} pixels")
+        
+        compatible_elements, zodiac, chinese, aura_colors = self.face_inputs(partner_profile)
+        render_key = face_key(compatible_elements, zodiac, chinese, aura_colors, self.seed, self.smooth_aura, size)
+        tag = f"{animation_format}{self.quality}" if animation_format == 'webp' else animation_format
+        key = f"{render_key}-anim{frames}x{duration}-{tag}"
+        extension, mime_type = ANIMATION_FORMATS[animation_format]
+        store = get_face_store() if not as_bytes else None
+        image_ref = store.get(key, extension) if store is not None else None
+        
+        if image_ref is None:
+            data = _face_cache_get(key)
+            if data is None:
+                images = self._create_animated_frames(compatible_elements, zodiac, chinese,
+                                                      aura_colors, size, frames)
+                data = encode_animation(images, animation_format, duration, self.quality)
+                _face_cache_put(key, data)
+            image_ref = store.put(key, data, extension) if store is not None else data
+        
+        return {
+            'image': image_ref,
+            'image_key': key,
+            'mime_type': mime_type,
+            'aura_description': self._generate_aura_description(compatible_elements, zodiac, chinese),
+            'color_palette': aura_colors
+        }
+        
+    def face_inputs(self, partner_profile: Dict) -> Tuple[List[str], str, str, List[str]]:
+        """
+        Render inputs of a partner profile, with defaults for missing values
+        
+        Returns:
+            (elements, western zodiac, Chinese sign, aura palette)
+        """
+        # Extract relevant attributes
+        compatible_elements = partner_profile.get('compatible_elements') or ['Wood', 'Water']
+        compatible_zodiacs = partner_profile.get('compatible_zodiacs') or ['Libra']
+        compatible_chinese = partner_profile.get('compatible_chinese') or ['Dragon']
+        aura_colors = partner_profile.get('aura_colors') or ['#4CAF50', '#2196F3', '#9C27B0']
+        return list(compatible_elements), compatible_zodiacs[0], compatible_chinese[0], list(aura_colors)
+        
+    def image_key(self, partner_profile: Dict, size: Optional[Tuple[int, int]] = None) -> str:
+        """
+        Content key of the encoded face for a profile, without rendering it
+        
+        Args:
+            partner_profile: Partner compatibility data
+            size: Render size (default RENDER_SIZE)
+            
+        Returns:
+            Render key plus encoding tag; also the face store file name
+        """
+        elements, zodiac, chinese, colors = self.face_inputs(partner_profile)
+        render_key = face_key(elements, zodiac, chinese, colors, self.seed, self.smooth_aura,
+                              tuple(size or RENDER_SIZE))
+        return f"{render_key}-{self.encoding_tag}"
+        
+    @property
+    def options(self) -> Dict[str, Any]:
+        """Constructor arguments that recreate this generator's output (e.g. in a worker process)"""
+        return {
+            'seed': self.seed,
+            'smooth_aura': self.smooth_aura,
+            'image_format': self.image_format,
+            'quality': self.quality,
+            'compress_level': self.compress_level,
+            'quantize_colors': self.quantize_colors
+        }
+        
+    @property
+    def encoding_tag(self) -> str:
+        """Short tag identifying the output encoding settings"""
+        if self.image_format in ('webp', 'jpeg'):
+            return f"{self.image_format}{self.quality}"
+        if self.image_format == 'png8':
+            return f"png8c{self.quantize_colors}z{self.compress_level}"
+        if self.image_format == 'svg':
+            return "svg"
+        return f"pngz{self.compress_level}"
+        
+    @staticmethod
+    def load_image(face_result: Dict[str, Any]) -> Optional[bytes]:
+        """
+        Return the encoded bytes of a face result, or None if the stored file
+        has since been evicted
+        
+        Args:
+            face_result: Output of generate_partner_face
+        """
+        image = face_result.get('image')
+        if isinstance(image, bytes):
+            return image
+        try:
+            with open(image, 'rb') as f:
+                return f.read()
+        except (OSError, TypeError):
+            return _face_cache_get(face_result.get('image_key', ''))
+        
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Any]:
+        """
+        Snapshot of the rendered-face cache
+        
+        Returns:
+            Hit/miss/eviction counters, entry count and bytes in use
+        """
+        with _face_cache_lock:
+            stats = dict(_face_cache_stats)
+            stats["entries"] = len(_face_cache)
+            stats["bytes"] = _face_cache_size
+        stats["max_bytes"] = FACE_CACHE_BYTES
+        with _layer_cache_lock:
+            stats["layers"] = dict(_layer_cache_stats, entries=len(_layer_cache), bytes=_layer_cache_size,
+                                   max_bytes=LAYER_CACHE_BYTES)
+        store = get_face_store()
+        if store is not None:
+            stats["store"] = store.metrics()
+        return stats
+        
+    def _create_abstract_face(self, elements: List[str], zodiac: str, chinese: str,
+                              colors: List[str], size: Tuple[int, int] = RENDER_SIZE,
+                              timings: Optional[Dict[str, float]] = None) -> Image.Image:
+        """
+        Generate an abstract face image by compositing cached layers
+        
+        Aura, outline, eyes, nose/mouth and texture pattern are each cached
+        under only the inputs that determine them, so a variant that changes
+        one input re-renders just the affected layers before compositing.
+        
+        Args:
+            timings: If given, seconds spent per stage (aura, outline, eyes,
+                nose_mouth, texture, effects) are added to it
+        """
+        texture = self.chinese_zodiac_textures.get(chinese, 'detailed')
         
         # Background aura
-        self._draw_aura_background(image, colors)
+        with _stage(timings, 'aura'):
+            aura, _ = self._layer(
+                ('aura', size, tuple(colors), self.smooth_aura),
+                lambda: (self._draw_aura_background(Image.new('RGB', size, 'white'), colors,
+                                                    self.smooth_aura).convert('RGBA'), (0, 0))
+            )
+            image = aura.copy()
+        
+        # Face outline, eyes based on elements, nose and mouth
+        for key, draw_layer in self._line_layer_specs(elements, zodiac, colors, size):
+            with _stage(timings, key[0]):
+                layer, offset = self._layer(key, lambda: self._line_layer(size, draw_layer))
+                if layer is not None:
+                    image.alpha_composite(layer, offset)
+        
+        # Apply texture and effects
+        with _stage(timings, 'texture'):
+            image = self._apply_texture(image.convert('RGB'), texture)
+        with _stage(timings, 'effects'):
+            image = self._add_element_effects(image, elements)
+        
+        return image
+    
+    def _line_layer_specs(self, elements: List[str], zodiac: str, colors: List[str],
+                          size: Tuple[int, int]) -> List[tuple]:
+        """
+        Cache keys and drawing functions of the outline, eyes and nose/mouth layers
         
-        # Get shape characteristics
+        Returns:
+            List of (layer cache key, function drawing the layer on an ImageDraw)
+        """
+        width, height = size
         shape_style = self.zodiac_shapes.get(zodiac, {'shape': 'oval', 'curves': 'smooth'})
+        outline_color = colors[0] if colors else '#9C27B0'
+        eye_color = colors[0] if colors else None
+        mouth_color = colors[1] if len(colors) > 1 else colors[0] if colors else None
+        return [
+            (('outline', size, shape_style['shape'], shape_style['curves'], outline_color),
+             lambda draw: self._draw_face_outline(draw, width, height, shape_style, outline_color)),
+            (('eyes', size, elements[0] if elements else None, eye_color),
+             lambda draw: self._draw_eyes(draw, width, height, elements, colors)),
+            (('nose_mouth', size, zodiac, mouth_color),
+             lambda draw: self._draw_nose_mouth(draw, width, height, zodiac, colors)),
+        ]
+    
+    def _create_animated_frames(self, elements: List[str], zodiac: str, chinese: str,
+                                colors: List[str], size: Tuple[int, int], frames: int) -> List[Image.Image]:
+        """
+        Frames of a pulsing aura around an otherwise static face
+        
+        The face is rendered once. Every stage after the aura (line layers,
+        texture, element effects) is close to linear for small brightness
+        changes, so each frame adds the change in ring opacity, passed
+        through the effect color matrix and the texture gain, to the still:
+        one integer lookup over the cached aura index plus the Fire glow disc.
+        
+        Returns:
+            RGB frames
+        """
+        width, height = size
+        still = self._create_abstract_face(elements, zodiac, chinese, colors, size)
+        base = np.asarray(still, dtype=np.int16)
+        
+        # 선이 덮은 픽셀에서는 오라가 보이지 않으므로 오라 바깥 단계(변화 없음)로 보냄
+        lines = Image.new('RGBA', size, (0, 0, 0, 0))
+        for key, draw_layer in self._line_layer_specs(elements, zodiac, colors, size):
+            layer, offset = self._layer(key, lambda: self._line_layer(size, draw_layer))
+            if layer is not None:
+                lines.alpha_composite(layer, offset)
+        index, positions = _aura_levels(width, height, self.smooth_aura)
+        index = np.where(np.asarray(lines.getchannel('A')) >= 128, len(positions), index).astype(np.uint8)
+        
+        # 텍스처와 원소 효과의 선형 부분 (3x3)
         texture = self.chinese_zodiac_textures.get(chinese, 'detailed')
+        linear = np.eye(3) * TEXTURE_GAIN.get(texture, 1.0)
+        glow = None
+        if elements:
+            pipeline = _effect_pipeline(tuple(elements), round(width / RENDER_SIZE[0], 3))
+            matrix = np.array(pipeline['matrix']).reshape(3, 4)
+            linear = matrix[:, :3] @ linear
+            if pipeline['glow_matrix'] is not None:
+                radius = max(1, round(pipeline['glow_radius'] * width))
+                tint = np.array(pipeline['glow_matrix']).reshape(3, 4)[:, 3] - matrix[:, 3]
+                disc = np.asarray(_disc_mask(radius), dtype=np.float32)[..., None] / 255 * tint
+                left, top = width // 2 - radius, height // 2 - radius
+                # 캔버스 밖으로 나가는 부분은 잘라냄
+                x0, y0 = max(0, left), max(0, top)
+                x1, y1 = min(width, left + disc.shape[1]), min(height, top + disc.shape[0])
+                glow = (slice(y0, y1), slice(x0, x1), disc[y0 - top:y1 - top, x0 - left:x1 - left])
         
-        # Face outline
-        self._draw_face_outline(draw, width, height, shape_style, colors[0] if colors else '#9C27B0')
+        ring_colors, ring_alpha = self._aura_palette(colors)
+        lower = np.floor(positions).astype(np.intp)
+        upper = np.minimum(lower + 1, AURA_RINGS - 1)
+        frac = (positions - lower)[:, None]
+        level_colors = ring_colors[lower] + (ring_colors[upper] - ring_colors[lower]) * frac
+        level_alpha = ring_alpha[lower] + (ring_alpha[upper] - ring_alpha[lower]) * frac[:, 0]
+        if self.smooth_aura:
+            # 바깥 링은 가장자리에서 0부터 서서히 나타남 (_draw_aura_background와 같음)
+            level_alpha = level_alpha * np.minimum(positions, 1)
+        # 오라 밑은 흰 바탕: 불투명도가 da 만큼 바뀌면 픽셀은 da/255 * (색 - 흰색) 만큼 바뀜
+        level_delta = (level_colors - 255) @ linear.T
         
-        # Eyes based on elements
-        self._draw_eyes(draw, width, height, elements, colors)
+        result = []
+        for frame in range(frames):
+            phase = 2 * math.pi * frame / frames
+            # 링 번호가 클수록 안쪽: 위상을 더하면 물결이 바깥으로 퍼짐
+            pulse = level_alpha * AURA_PULSE_DEPTH * np.sin(phase + 2 * math.pi * positions / AURA_RINGS)
+            lut = np.zeros((len(positions) + 1, 3), dtype=np.int16)
+            lut[:-1] = np.rint(level_delta * (pulse / 255)[:, None])
+            pixels = base + np.take(lut, index, axis=0)
+            if glow is not None:
+                rows, cols, disc = glow
+                pixels[rows, cols] += np.rint(disc * (GLOW_PULSE_GAIN * (0.5 + 0.5 * math.sin(phase)))).astype(np.int16)
+            np.clip(pixels, 0, 255, out=pixels)
+            result.append(Image.fromarray(pixels.astype(np.uint8), 'RGB'))
+        return result
+    
+    def _layer(self, key: tuple, render) -> tuple:
+        """Return the cached (image, offset) layer for key, rendering it on a miss"""
+        entry = _layer_cache_get(key)
+        if entry is None:
+            entry = render()
+            _layer_cache_put(key, entry)
+        return entry
+    
+    def _line_layer(self, size: Tuple[int, int], draw_layer) -> tuple:
+        """
+        Draw onto a transparent canvas and crop to the drawn area
         
-        # Nose and mouth
-        self._draw_nose_mouth(draw, width, height, zodiac, colors)
+        Returns:
+            (RGBA image, top-left offset), or (None, None) if nothing was drawn
+        """
+        layer = Image.new('RGBA', size, (0, 0, 0, 0))
+        draw_layer(ImageDraw.Draw(layer))
+        bbox = layer.getbbox()
+        if bbox is None:
+            return None, None
+        return layer.crop(bbox), bbox[:2]
+    
+    def _texture_seed(self, texture: str, size: Tuple[int, int]) -> int:
+        """Deterministic noise seed from the texture inputs (and the generator seed)"""
+        payload = json.dumps([texture, list(size), self.seed])
+        return int(hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16], 16)
+    
+    def _create_svg_face(self, elements: List[str], zodiac: str, chinese: str,
+                         colors: List[str], size: Tuple[int, int] = RENDER_SIZE) -> str:
+        """
+        Generate the abstract face as SVG markup
         
-        # Apply texture and effects
-        image = self._apply_texture(image, texture)
-        image = self._add_element_effects(image, elements)
+        Draws the same primitives as _create_abstract_face through an
+        SvgCanvas; the aura becomes rings or a radial gradient, and the
+        texture and element effects become SVG patterns and filters.
         
-        return image
+        Returns:
+            SVG document
+        """
+        width, height = size
+        canvas = SvgCanvas(width, height)
+        shape_style = self.zodiac_shapes.get(zodiac, {'shape': 'oval', 'curves': 'smooth'})
+        texture = self.chinese_zodiac_textures.get(chinese, 'detailed')
+        pipeline = _effect_pipeline(tuple(elements), round(width / RENDER_SIZE[0], 3)) if elements else None
+        
+        canvas.begin_group(self._svg_effects_filter(canvas, pipeline))
+        canvas.begin_group(self._svg_texture_filter(canvas, texture, width))
+        canvas.add('<rect width="100%" height="100%" fill="#fff"/>')
+        self._svg_aura(canvas, colors, self.smooth_aura)
+        self._draw_face_outline(canvas, width, height, shape_style, colors[0] if colors else '#9C27B0')
+        self._draw_eyes(canvas, width, height, elements, colors)
+        self._draw_nose_mouth(canvas, width, height, zodiac, colors)
+        self._svg_texture_overlay(canvas, texture)
+        canvas.end_group()
+        canvas.end_group()
+        
+        if pipeline is not None and pipeline['glow_matrix'] is not None:
+            # 불 원소의 빛: 원 안쪽에만 더해지는 오프셋을 같은 효과의 반투명 원으로 표현
+            shift = np.array(pipeline['glow_matrix'][3::4]) - np.array(pipeline['matrix'][3::4])
+            opacity = max(float(np.abs(shift).max()), 1e-6) / 255
+            tint = np.clip(255 + shift / opacity, 0, 255)
+            radius = max(1, round(pipeline['glow_radius'] * width)) + 0.5
+            canvas.add(f'<circle cx="{width // 2}" cy="{height // 2}" r="{radius}" '
+                       f'fill="{svg_color(tint)}" fill-opacity="{opacity:.4f}"/>')
+        
+        return canvas.tostring()
     
-    def _draw_aura_background(self, image: Image.Image, colors: List[str]) -> None:
-        """Draw aura-like background effect"""
-        width, height = image.size
+    def _svg_aura(self, canvas: SvgCanvas, colors: List[str], smooth: bool = False) -> None:
+        """Aura rings (or a radial gradient when smooth) matching _draw_aura_background"""
+        width, height = canvas.width, canvas.height
+        cx, cy = width // 2, height // 2
+        outer = min(width, height) / 2 + 0.5
+        half_step = min(width, height) * AURA_RING_STEP / 2
+        ring_colors = [colors[i % len(colors)] for i in range(AURA_RINGS)]
+        ring_opacity = [(50 - i * 5) / 255 for i in range(AURA_RINGS)]
         
-        # Create gradient overlay
-        overlay = Image.new('RGBA', (width, height), (255, 255, 255, 0))
-        draw = ImageDraw.Draw(overlay)
-        
-        # Draw radial gradient
-        for i in range(10):
-            radius = min(width, height) - i * 20
-            color = colors[i % len(colors)]
-            # Convert hex to RGB with alpha
-            r, g, b = self._hex_to_rgb(color)
-            alpha = 50 - i * 5  # Decreasing opacity
-            rgba = (r, g, b, alpha)
-            
-            draw.ellipse(
-                (width/2 - radius/2, height/2 - radius/2, 
-                 width/2 + radius/2, height/2 + radius/2),
-                fill=rgba,
-                outline=None
+        if smooth:
+            stops = []
+            for i in reversed(range(AURA_RINGS)):
+                offset = (outer - i * half_step) / outer
+                # 바깥 링은 가장자리에서 0부터 서서히 나타남
+                opacity = ring_opacity[i] if i > 0 else 0
+                stops.append(f'<stop offset="{offset:.4f}" stop-color="{ring_colors[i]}" stop-opacity="{opacity:.4f}"/>')
+            canvas.define(f'<radialGradient id="aura" gradientUnits="userSpaceOnUse" cx="{cx}" cy="{cy}" '
+                          f'r="{outer:.2f}">{"".join(stops)}</radialGradient>')
+            canvas.add(f'<circle cx="{cx}" cy="{cy}" r="{outer:.2f}" fill="url(#aura)"/>')
+            return
+        
+        # 각 링은 안쪽 링과 겹치지 않는 띠로 그려서 불투명도가 누적되지 않게 함
+        for i in range(AURA_RINGS - 1):
+            radius = outer - (i + 0.5) * half_step
+            canvas.add(f'<circle cx="{cx}" cy="{cy}" r="{radius:.2f}" fill="none" stroke="{ring_colors[i]}" '
+                       f'stroke-opacity="{ring_opacity[i]:.4f}" stroke-width="{half_step:.2f}"/>')
+        canvas.add(f'<circle cx="{cx}" cy="{cy}" r="{outer - (AURA_RINGS - 1) * half_step:.2f}" '
+                   f'fill="{ring_colors[-1]}" fill-opacity="{ring_opacity[-1]:.4f}"/>')
+    
+    def _svg_texture_filter(self, canvas: SvgCanvas, texture: str, width: int) -> Optional[str]:
+        """Whole-image filter for the soft/smooth and strong/loyal textures"""
+        scale = width / RENDER_SIZE[0]
+        if texture in ('soft', 'smooth'):
+            blur, slope = f'<feGaussianBlur stdDeviation="{scale:.2f}"/>', 0.9
+        elif texture in ('strong', 'loyal'):
+            blur, slope = '', 1.2
+        else:
+            return None
+        intercept = (1 - slope) * SVG_CONTRAST_PIVOT
+        funcs = ''.join(f'<feFunc{channel} type="linear" slope="{slope}" intercept="{intercept:.4f}"/>'
+                        for channel in 'RGB')
+        canvas.define(f'<filter id="texture" color-interpolation-filters="sRGB">{blur}'
+                      f'<feComponentTransfer>{funcs}</feComponentTransfer></filter>')
+        return 'texture'
+    
+    def _svg_texture_overlay(self, canvas: SvgCanvas, texture: str) -> None:
+        """Noise or checkerboard overlay for the detailed/striped and scaled/textured textures"""
+        scale = canvas.width / RENDER_SIZE[0]
+        if texture in ('detailed', 'striped'):
+            seed = self._texture_seed(texture, (canvas.width, canvas.height)) % (2 ** 31 - 1) + 1
+            # 노이즈의 상위 값만 검은 점으로 남기고 살짝 흐림
+            canvas.define(
+                f'<filter id="noise" x="0" y="0" width="100%" height="100%" color-interpolation-filters="sRGB">'
+                f'<feTurbulence type="fractalNoise" baseFrequency="{0.5 / scale:.3f}" numOctaves="1" seed="{seed}"/>'
+                f'<feColorMatrix type="matrix" values="0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0"/>'
+                f'<feComponentTransfer><feFuncA type="discrete" tableValues="0 0 1"/></feComponentTransfer>'
+                f'<feGaussianBlur stdDeviation="{scale:.2f}"/></filter>'
+            )
+            canvas.add('<rect width="100%" height="100%" filter="url(#noise)" opacity="0.1"/>')
+        elif texture in ('scaled', 'textured'):
+            size = max(2, round(canvas.width * 0.02))
+            canvas.define(
+                f'<pattern id="checker" width="{2 * size}" height="{2 * size}" patternUnits="userSpaceOnUse">'
+                f'<rect width="{2 * size}" height="{2 * size}" fill="#fff"/>'
+                f'<rect width="{size}" height="{size}" fill="#d3d3d3"/>'
+                f'<rect x="{size}" y="{size}" width="{size}" height="{size}" fill="#d3d3d3"/></pattern>'
+                f'<filter id="checker-blur"><feGaussianBlur stdDeviation="{2 * scale:.2f}"/></filter>'
             )
+            canvas.add('<rect width="100%" height="100%" fill="url(#checker)" filter="url(#checker-blur)" opacity="0.1"/>')
+    
+    def _svg_effects_filter(self, canvas: SvgCanvas, pipeline: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Element effects as one feColorMatrix plus an optional feConvolveMatrix"""
+        if pipeline is None:
+            return None
+        m = pipeline['matrix']
+        rows = [f"{m[4 * row]:.4f} {m[4 * row + 1]:.4f} {m[4 * row + 2]:.4f} 0 {m[4 * row + 3] / 255:.4f}"
+                for row in range(3)]
+        primitives = f'<feColorMatrix type="matrix" values="{" ".join(rows)} 0 0 0 1 0"/>'
+        if pipeline['kernel'] is not None:
+            size, _, _, weights = pipeline['kernel'].filterargs
+            primitives += (f'<feConvolveMatrix order="{size[0]}" kernelMatrix="{" ".join(f"{w:.4f}" for w in weights)}" '
+                           f'edgeMode="duplicate" preserveAlpha="true"/>')
+        canvas.define(f'<filter id="effects" x="0" y="0" width="100%" height="100%" '
+                      f'color-interpolation-filters="sRGB">{primitives}</filter>')
+        return 'effects'
+    
+    def _draw_aura_background(self, image: Image.Image, colors: List[str],
+                              smooth: bool = False) -> Image.Image:
+        """
+        Composite an aura-like radial gradient over the image in one array pass
+        
+        Each ring keeps the original look: the ring color cycles through the
+        palette and its opacity decreases towards the center.
         
-        # Blend overlay with original image
-        image.paste(overlay, (0, 0), overlay)
+        Args:
+            image: Image to draw on
+            colors: Aura palette (hex colors)
+            smooth: Interpolate between rings and fade in the outer edge
+                instead of drawing hard ring steps
+            
+        Returns:
+            The composited image
+        """
+        width, height = image.size
+        field = _aura_ring_field(width, height)
+        ring_colors, ring_alpha = self._aura_palette(colors)
         
-        # Apply blur
-        image = image.filter(ImageFilter.GaussianBlur(radius=2))
+        if smooth:
+            position = np.clip(field, 0, AURA_RINGS - 1)
+            lower = position.astype(np.intp)
+            upper = np.minimum(lower + 1, AURA_RINGS - 1)
+            frac = position - lower
+            overlay = np.empty((height, width, 4), dtype=np.float32)
+            overlay[..., :3] = ring_colors[lower] + (ring_colors[upper] - ring_colors[lower]) * frac[..., None]
+            # 바깥 링은 가장자리에서 0부터 서서히 나타남
+            overlay[..., 3] = (ring_alpha[lower] + (ring_alpha[upper] - ring_alpha[lower]) * frac) * np.clip(field, 0, 1)
+            overlay = np.rint(overlay).astype(np.uint8)
+        else:
+            # 링 번호 -> RGBA 룩업 테이블 (마지막 항목은 오라 바깥, 완전 투명)
+            lut = np.zeros((AURA_RINGS + 1, 4), dtype=np.uint8)
+            lut[:AURA_RINGS, :3] = ring_colors
+            lut[:AURA_RINGS, 3] = ring_alpha
+            overlay = lut[_aura_ring_index(width, height)]
         
+        overlay_image = Image.fromarray(overlay, 'RGBA')
+        result = image.convert('RGB')
+        result.paste(overlay_image, (0, 0), overlay_image)
+        return result
+    
+    def _aura_palette(self, colors: List[str]) -> tuple:
+        """Ring colors (cycling through the palette) and opacities, outermost ring first"""
+        ring_colors = np.array(
+            [self._hex_to_rgb(colors[i % len(colors)]) for i in range(AURA_RINGS)], dtype=np.float32
+        )
+        ring_alpha = np.array([50 - i * 5 for i in range(AURA_RINGS)], dtype=np.float32)
+        return ring_colors, ring_alpha
+    
     def _draw_face_outline(self, draw: ImageDraw.Draw, width: int, height: int, 
                           shape_style: Dict, color: str) -> None:
         """Draw face outline based on zodiac shape"""
@@ -220,7 +1141,7 @@ class FaceGenerator:
         rgb = self._hex_to_rgb(color)
         
         # Face center and dimensions
-        center_x, center_y = width // 2, height // 2 - 50
+        center_x, center_y = _face_center(width, height)
         face_width = width * 0.7
         face_height = height * 0.6
         
@@ -230,7 +1151,7 @@ class FaceGenerator:
                 (center_x - face_width/2, center_y - face_height/2,
                  center_x + face_width/2, center_y + face_height/2),
                 outline=rgb,
-                width=3
+                width=_stroke(width, 3)
             )
         elif shape == 'triangle' or shape == 'arrows':
             # More angular face
@@ -239,29 +1160,29 @@ class FaceGenerator:
                 (center_x - face_width/2, center_y + face_height/2),  # Bottom left
                 (center_x + face_width/2, center_y + face_height/2)   # Bottom right
             ]
-            draw.polygon(points, outline=rgb, fill=None)
+            draw.polygon(points, outline=rgb, fill=None, width=_stroke(width, 1))
         elif shape == 'balanced' or shape == 'structured':
             # More structured face
             draw.rectangle(
                 (center_x - face_width/2, center_y - face_height/2,
                  center_x + face_width/2, center_y + face_height/2),
                 outline=rgb,
-                width=3
+                width=_stroke(width, 3)
             )
         elif shape == 'dual':
             # Two overlapping shapes
-            offset = 30
+            offset = width * 0.06
             draw.ellipse(
                 (center_x - face_width/2 - offset, center_y - face_height/2,
                  center_x + face_width/2 - offset, center_y + face_height/2),
                 outline=rgb,
-                width=2
+                width=_stroke(width, 2)
             )
             draw.ellipse(
                 (center_x - face_width/2 + offset, center_y - face_height/2,
                  center_x + face_width/2 + offset, center_y + face_height/2),
                 outline=rgb,
-                width=2
+                width=_stroke(width, 2)
             )
         else:
             # Default to oval with unique characteristics
@@ -269,7 +1190,7 @@ class FaceGenerator:
                 (center_x - face_width/2, center_y - face_height/2,
                  center_x + face_width/2, center_y + face_height/2),
                 outline=rgb,
-                width=3
+                width=_stroke(width, 3)
             )
             
             # Add extra details based on curves
@@ -277,26 +1198,26 @@ class FaceGenerator:
                 # Add wavy lines
                 for i in range(0, 360, 30):
                     angle = math.radians(i)
-                    x1 = center_x + (face_width/2 - 10) * math.cos(angle)
-                    y1 = center_y + (face_height/2 - 10) * math.sin(angle)
-                    x2 = center_x + (face_width/2 + 20) * math.cos(angle)
-                    y2 = center_y + (face_height/2 + 20) * math.sin(angle)
-                    draw.line((x1, y1, x2, y2), fill=rgb, width=1)
+                    x1 = center_x + (face_width/2 - width*0.02) * math.cos(angle)
+                    y1 = center_y + (face_height/2 - width*0.02) * math.sin(angle)
+                    x2 = center_x + (face_width/2 + width*0.04) * math.cos(angle)
+                    y2 = center_y + (face_height/2 + width*0.04) * math.sin(angle)
+                    draw.line((x1, y1, x2, y2), fill=rgb, width=_stroke(width, 1))
             elif curves == 'sharp':
                 # Add sharp angles
                 points = []
                 for i in range(0, 360, 40):
                     angle = math.radians(i)
-                    r = face_width/2 if i % 80 == 0 else face_width/2 - 10
+                    r = face_width/2 if i % 80 == 0 else face_width/2 - width*0.02
                     x = center_x + r * math.cos(angle)
                     y = center_y + r * math.sin(angle)
                     points.append((x, y))
-                draw.polygon(points, outline=rgb, width=1, fill=None)
+                draw.polygon(points, outline=rgb, width=_stroke(width, 1), fill=None)
     
     def _draw_eyes(self, draw: ImageDraw.Draw, width: int, height: int, 
                   elements: List[str], colors: List[str]) -> None:
         """Draw eyes based on elements"""
-        center_x, center_y = width // 2, height // 2 - 50
+        center_x, center_y = _face_center(width, height)
         eye_distance = width * 0.25
         eye_size = width * 0.12
         
@@ -317,13 +1238,13 @@ class FaceGenerator:
                 (left_eye_x - eye_size/2, left_eye_y - eye_size/3,
                  left_eye_x + eye_size/2, left_eye_y + eye_size/3),
                 outline=self._hex_to_rgb(colors[0] if colors else '#4CAF50'),
-                width=2
+                width=_stroke(width, 2)
             )
             draw.ellipse(
                 (right_eye_x - eye_size/2, right_eye_y - eye_size/3,
                  right_eye_x + eye_size/2, right_eye_y + eye_size/3),
                 outline=self._hex_to_rgb(colors[0] if colors else '#4CAF50'),
-                width=2
+                width=_stroke(width, 2)
             )
         elif primary_element == 'Fire':
             # Sharp, angled eyes
@@ -332,14 +1253,16 @@ class FaceGenerator:
                  (left_eye_x, left_eye_y - eye_size/3),
                  (left_eye_x + eye_size/2, left_eye_y),
                  (left_eye_x, left_eye_y + eye_size/3)],
-                outline=self._hex_to_rgb(colors[0] if colors else '#F44336')
+                outline=self._hex_to_rgb(colors[0] if colors else '#F44336'),
+                width=_stroke(width, 1)
             )
             draw.polygon(
                 [(right_eye_x - eye_size/2, right_eye_y),
                  (right_eye_x, right_eye_y - eye_size/3),
                  (right_eye_x + eye_size/2, right_eye_y),
                  (right_eye_x, right_eye_y + eye_size/3)],
-                outline=self._hex_to_rgb(colors[0] if colors else '#F44336')
+                outline=self._hex_to_rgb(colors[0] if colors else '#F44336'),
+                width=_stroke(width, 1)
             )
         elif primary_element == 'Earth':
             # Round, stable eyes
@@ -347,13 +1270,13 @@ class FaceGenerator:
                 (left_eye_x - eye_size/2, left_eye_y - eye_size/2,
                  left_eye_x + eye_size/2, left_eye_y + eye_size/2),
                 outline=self._hex_to_rgb(colors[0] if colors else '#FFC107'),
-                width=2
+                width=_stroke(width, 2)
             )
             draw.ellipse(
                 (right_eye_x - eye_size/2, right_eye_y - eye_size/2,
                  right_eye_x + eye_size/2, right_eye_y + eye_size/2),
                 outline=self._hex_to_rgb(colors[0] if colors else '#FFC107'),
-                width=2
+                width=_stroke(width, 2)
             )
         elif primary_element == 'Metal':
             # Sharp, precise eyes
@@ -361,36 +1284,27 @@ class FaceGenerator:
                 (left_eye_x - eye_size/2, left_eye_y - eye_size/4,
                  left_eye_x + eye_size/2, left_eye_y + eye_size/4),
                 outline=self._hex_to_rgb(colors[0] if colors else '#9E9E9E'),
-                width=2
+                width=_stroke(width, 2)
             )
             draw.rectangle(
                 (right_eye_x - eye_size/2, right_eye_y - eye_size/4,
                  right_eye_x + eye_size/2, right_eye_y + eye_size/4),
                 outline=self._hex_to_rgb(colors[0] if colors else '#9E9E9E'),
-                width=2
+                width=_stroke(width, 2)
             )
         else:  # Water
-            # Flowing, curved eyes
-            for i in range(3):
-                draw.arc(
-                    (left_eye_x - eye_size/2 - i*2, left_eye_y - eye_size/3 - i*2,
-                     left_eye_x + eye_size/2 + i*2, left_eye_y + eye_size/3 + i*2),
-                    200, 340,
-                    fill=self._hex_to_rgb(colors[0] if colors else '#2196F3'),
-                    width=1
-                )
-                draw.arc(
-                    (right_eye_x - eye_size/2 - i*2, right_eye_y - eye_size/3 - i*2,
-                     right_eye_x + eye_size/2 + i*2, right_eye_y + eye_size/3 + i*2),
-                    200, 340,
-                    fill=self._hex_to_rgb(colors[0] if colors else '#2196F3'),
-                    width=1
-                )
+            # Flowing, curved eyes: three widening arcs per eye
+            stroke = _stroke(width, 1)
+            rgb = self._hex_to_rgb(colors[0] if colors else '#2196F3')
+            for eye_x, eye_y in ((left_eye_x, left_eye_y), (right_eye_x, right_eye_y)):
+                box = (eye_x - eye_size/2, eye_y - eye_size/3, eye_x + eye_size/2, eye_y + eye_size/3)
+                for arc in _arc_polylines(box, 200, 340, width*0.004, 3, stroke):
+                    draw.line(arc, fill=rgb, width=stroke, joint='curve')
     
     def _draw_nose_mouth(self, draw: ImageDraw.Draw, width: int, height: int, 
                         zodiac: str, colors: List[str]) -> None:
         """Draw nose and mouth based on zodiac sign"""
-        center_x, center_y = width // 2, height // 2 - 50
+        center_x, center_y = _face_center(width, height)
         
         # Nose position
         nose_x, nose_y = center_x, center_y + height * 0.1
@@ -411,7 +1325,8 @@ class FaceGenerator:
                 [(nose_x, nose_y - nose_size),
                  (nose_x - nose_size, nose_y + nose_size),
                  (nose_x + nose_size, nose_y + nose_size)],
-                outline=color
+                outline=color,
+                width=_stroke(width, 1)
             )
             
             # Smiling mouth
@@ -420,14 +1335,15 @@ class FaceGenerator:
                  mouth_x + mouth_width/2, mouth_y + mouth_height),
                 0, 180,
                 fill=color,
-                width=2
+                width=_stroke(width, 2)
             )
         elif zodiac in ['Taurus', 'Virgo', 'Capricorn']:  # Earth signs
             # Practical, grounded features
             draw.rectangle(
                 (nose_x - nose_size/2, nose_y - nose_size,
                  nose_x + nose_size/2, nose_y + nose_size),
-                outline=color
+                outline=color,
+                width=_stroke(width, 1)
             )
             
             # Straight mouth
@@ -435,7 +1351,7 @@ class FaceGenerator:
                 (mouth_x - mouth_width/2, mouth_y, 
                  mouth_x + mouth_width/2, mouth_y),
                 fill=color,
-                width=2
+                width=_stroke(width, 2)
             )
         elif zodiac in ['Gemini', 'Libra', 'Aquarius']:  # Air signs
             # Light, intellectual features
@@ -443,7 +1359,7 @@ class FaceGenerator:
                 (nose_x, nose_y - nose_size,
                  nose_x, nose_y + nose_size),
                 fill=color,
-                width=2
+                width=_stroke(width, 2)
             )
             
             # Slight smile
@@ -452,63 +1368,34 @@ class FaceGenerator:
                  mouth_x + mouth_width/2, mouth_y + mouth_height*2),
                 0, 180,
                 fill=color,
-                width=1
+                width=_stroke(width, 1)
             )
         else:  # Water signs
             # Flowing, emotional features
-            for i in range(3):
-                draw.arc(
-                    (nose_x - nose_size - i, nose_y - nose_size - i,
-                     nose_x + nose_size + i, nose_y + nose_size + i),
-                    220, 320,
-                    fill=color,
-                    width=1
-                )
+            stroke = _stroke(width, 1)
+            box = (nose_x - nose_size, nose_y - nose_size, nose_x + nose_size, nose_y + nose_size)
+            for arc in _arc_polylines(box, 220, 320, width*0.002, 3, stroke):
+                draw.line(arc, fill=color, width=stroke, joint='curve')
             
-            # Wavy mouth
-            for i in range(mouth_width):
-                x = mouth_x - mouth_width/2 + i
-                y = mouth_y + math.sin(i * 0.2) * mouth_height
-                draw.point((x, y), fill=color)
+            # Wavy mouth as one continuous line (wave period scales with the canvas width)
+            draw.line(_wave_polyline(width, height), fill=color, width=stroke, joint='curve')
     
     def _apply_texture(self, image: Image.Image, texture: str) -> Image.Image:
         """Apply texture effect based on Chinese zodiac"""
-        if texture == 'detailed' or texture == 'striped':
-            # Add some noise
-            noise = Image.new('RGB', image.size, 'white')
-            noise_draw = ImageDraw.Draw(noise)
-            
-            for x in range(0, image.width, 2):
-                for y in range(0, image.height, 2):
-                    if random.random() > 0.7:
-                        noise_draw.point((x, y), fill='black')
-            
-            noise = noise.filter(ImageFilter.GaussianBlur(radius=1))
-            image = Image.blend(image, noise, 0.1)
+        if texture in ('detailed', 'striped', 'scaled', 'textured'):
+            # Blend with the cached noise or checkerboard pattern
+            pattern, _ = self._layer(
+                ('texture', image.size, texture, self.seed),
+                lambda: (self._texture_pattern(texture, image.size), (0, 0))
+            )
+            image = Image.blend(image, pattern, 0.1)
             
         elif texture == 'soft' or texture == 'smooth':
             # Soften the image
-            image = image.filter(ImageFilter.GaussianBlur(radius=1))
+            image = image.filter(ImageFilter.GaussianBlur(radius=image.width / RENDER_SIZE[0]))
             enhancer = ImageEnhance.Contrast(image)
             image = enhancer.enhance(0.9)
             
-        elif texture == 'scaled' or texture == 'textured':
-            # Add a pattern
-            pattern = Image.new('RGB', image.size, 'white')
-            pattern_draw = ImageDraw.Draw(pattern)
-            
-            size = 10
-            for x in range(0, image.width, size):
-                for y in range(0, image.height, size):
-                    if (x + y) % (size*2) == 0:
-                        pattern_draw.rectangle(
-                            (x, y, x + size, y + size),
-                            fill=(211, 211, 211)
-                        )
-            
-            pattern = pattern.filter(ImageFilter.GaussianBlur(radius=2))
-            image = Image.blend(image, pattern, 0.1)
-            
         elif texture == 'strong' or texture == 'loyal':
             # Enhance contrast
             enhancer = ImageEnhance.Contrast(image)
@@ -516,67 +1403,66 @@ class FaceGenerator:
         
         return image
     
-    def _add_element_effects(self, image: Image.Image, elements: List[str]) -> Image.Image:
-        """Add special effects based on elements"""
+    def _texture_pattern(self, texture: str, size: Tuple[int, int]) -> Image.Image:
+        """Blurred noise (detailed/striped) or checkerboard (scaled/textured) pattern"""
+        width, height = size
+        scale = width / RENDER_SIZE[0]
+        
+        if texture == 'detailed' or texture == 'striped':
+            # Add some noise: black dots on ~30% of a grid with 1/250-width spacing
+            step = max(1, round(width / 250))
+            pattern = np.full((height, width), 255, dtype=np.uint8)
+            grid = pattern[::step, ::step]
+            rng = np.random.default_rng(self._texture_seed(texture, size))
+            grid[rng.random(grid.shape) > 0.7] = 0
+            radius = scale
+        else:
+            # Add a checkerboard pattern of light gray cells; cell borders are
+            # one pixel wider on the right/bottom, as with inclusive rectangles
+            cell = max(2, round(width * 0.02))
+            ys, xs = np.ogrid[:height, :width]
+            gray = (((xs // cell + ys // cell) % 2 == 0)
+                    | ((xs % cell == 0) & (xs > 0))
+                    | ((ys % cell == 0) & (ys > 0)))
+            pattern = np.where(gray, 211, 255).astype(np.uint8)
+            radius = 2 * scale
+        
+        # Blur in grayscale (identical per channel), then expand to RGB
+        return Image.fromarray(pattern, 'L').filter(ImageFilter.GaussianBlur(radius=radius)).convert('RGB')
+    
+    def _add_element_effects(self, image: Image.Image, elements: List[str],
+                             sharpen: bool = True) -> Image.Image:
+        """
+        Add special effects based on elements
+        
+        The effects of all elements are folded into one color matrix that is
+        applied in a single pass (see _effect_pipeline).
+        
+        Args:
+            image: Face image
+            elements: Element names in application order
+            sharpen: Apply the blur/sharpen convolution of Water and Metal
+            
+        Returns:
+            New image with the effects applied
+        """
         if not elements:
             return image
-            
-        # Create a copy to work with
-        result = image.copy()
+        
         width, height = image.size
+        pipeline = _effect_pipeline(tuple(elements), round(width / RENDER_SIZE[0], 3))
         
-        for element in elements:
-            if element == 'Fire':
-                # Add warm glow
-                overlay = Image.new('RGBA', image.size, (0, 0, 0, 0))
-                draw = ImageDraw.Draw(overlay)
-                
-                center_x, center_y = width // 2, height // 2
-                for i in range(5):
-                    radius = 100 - i * 15
-                    draw.ellipse(
-                        (center_x - radius, center_y - radius,
-                         center_x + radius, center_y + radius),
-                        fill=(255, 100, 0, 10),
-                        outline=None
-                    )
-                
-                # Convert to RGB for blending
-                overlay_rgb = Image.new('RGB', image.size, 'white')
-                overlay_rgb.paste(overlay, (0, 0), overlay)
-                
-                # Blend with result
-                result = Image.blend(result, overlay_rgb, 0.2)
-                
-            elif element == 'Water':
-                # Add blue shimmering effect
-                result = result.filter(ImageFilter.GaussianBlur(radius=0.5))
-                blue_overlay = Image.new('RGB', image.size, (230, 240, 255))
-                result = Image.blend(result, blue_overlay, 0.1)
-                
-            elif element == 'Earth':
-                # Add stability and warmth
-                enhancer = ImageEnhance.Color(result)
-                result = enhancer.enhance(1.2)
-                
-                brown_overlay = Image.new('RGB', image.size, (255, 250, 240))
-                result = Image.blend(result, brown_overlay, 0.1)
-                
-            elif element == 'Metal':
-                # Add sharpness and clarity
-                enhancer = ImageEnhance.Sharpness(result)
-                result = enhancer.enhance(1.5)
-                
-                gray_overlay = Image.new('RGB', image.size, (245, 245, 245))
-                result = Image.blend(result, gray_overlay, 0.1)
-                
-            elif element == 'Wood':
-                # Add vibrant green undertones
-                green_overlay = Image.new('RGB', image.size, (240, 255, 240))
-                result = Image.blend(result, green_overlay, 0.1)
-                
-                enhancer = ImageEnhance.Color(result)
-                result = enhancer.enhance(1.1)
+        source = image.convert('RGB')
+        result = source.convert('RGB', pipeline['matrix'])
+        if pipeline['glow_matrix'] is not None:
+            # 불 원소: 중앙 원 안쪽만 다른 오프셋으로 다시 변환해서 덮어씀
+            radius = max(1, round(pipeline['glow_radius'] * width))
+            box = (width // 2 - radius, height // 2 - radius, width // 2 + radius + 1, height // 2 + radius + 1)
+            glow = source.crop(box).convert('RGB', pipeline['glow_matrix'])
+            result.paste(glow, box[:2], _disc_mask(radius))
+        
+        if sharpen and pipeline['kernel'] is not None:
+            result = result.filter(pipeline['kernel'])
         
         return result
     
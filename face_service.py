@@ -0,0 +1,235 @@
+import os
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Dict, Any, Optional, Tuple
+
+from face_generator import FaceGenerator, RENDER_SIZE
+
+# 작업자 프로세스마다 하나의 생성기 (레이어 캐시를 요청 간에 재사용)
+_worker_generator: Optional[FaceGenerator] = None
+
+
+def _render_in_worker(options: Dict[str, Any], partner_profile: Dict[str, Any],
+                      size: Tuple[int, int]) -> Dict[str, Any]:
+    """
+    Render one face in a pool process (module level so it can be pickled)
+
+    options are the parent generator's settings, so the worker encodes and
+    keys the face exactly as the parent computed its image key.
+    """
+    global _worker_generator
+    if _worker_generator is None or _worker_generator.options != options:
+        _worker_generator = FaceGenerator(**options)
+    # 결과 이미지는 공유 얼굴 저장소 경로로 돌려받음 (저장소가 꺼져 있으면 바이트)
+    return _worker_generator.generate_partner_face({}, partner_profile, size=size)
+
+
+class FaceRenderService:
+    """
+    Render partner faces in a bounded process pool off the script thread
+
+    At most `capacity` renders are queued or running at once. Further
+    requests are rejected immediately with a "busy" status instead of
+    piling up, so a burst of users cannot stall the server. Requests for a
+    face that is already queued share the pending render, and faces that
+    are already in the face store are returned without touching the pool.
+
+    Every call returns a status dictionary: {'status': 'ready', 'result':
+    face result}, {'status': 'pending'}, {'status': 'busy'} or
+    {'status': 'failed', 'error': message}, always with 'image_key'.
+    """
+
+    def __init__(self, workers: int = 2, capacity: int = 8, keep_done: int = 256):
+        """
+        Args:
+            workers: Render processes
+            capacity: Maximum renders queued or running at once
+            keep_done: Finished renders kept for callers that have not polled yet
+        """
+        self.workers = workers
+        self.capacity = capacity
+        self.keep_done = keep_done
+        self.generator = FaceGenerator()
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Future]" = OrderedDict()
+        self._in_flight = 0
+        self._stats = {"submitted": 0, "shared": 0, "store_hits": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    def submit(self, partner_profile: Dict[str, Any], size: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        """
+        Request a face render without blocking
+
+        Args:
+            partner_profile: Partner compatibility data
+            size: Render size (default RENDER_SIZE)
+
+        Returns:
+            Status dictionary (see the class docstring)
+        """
+        size = tuple(size or RENDER_SIZE)
+        key = self.generator.image_key(partner_profile, size)
+
+        with self._lock:
+            if self._known(key):
+                self._stats["shared"] += 1
+                return self._status(key)
+
+        # 저장소에 있으면 렌더링 없이 바로 반환 (경로 조회와 설명 생성만 수행,
+        # 그 사이 정리된 경우 스크립트 스레드에서 렌더링하지 않고 풀에 제출)
+        result = self.generator.stored_partner_face(partner_profile, size)
+        if result is not None:
+            with self._lock:
+                self._stats["store_hits"] += 1
+            return {"status": "ready", "image_key": key, "result": result}
+
+        with self._lock:
+            if self._known(key):
+                self._stats["shared"] += 1
+                return self._status(key)
+            if self._in_flight >= self.capacity:
+                self._stats["rejected"] += 1
+                return {"status": "busy", "image_key": key}
+            if self._executor is None:
+                # fork는 스레드가 있는 앱 프로세스(Streamlit, 잠금 보유 중인 스레드)에서 안전하지 않음
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            future = self._executor.submit(_render_in_worker, self.generator.options, partner_profile, size)
+            self._jobs[key] = future
+            self._in_flight += 1
+            self._stats["submitted"] += 1
+            self._trim()
+        future.add_done_callback(self._on_done)
+        return {"status": "pending", "image_key": key}
+
+    def poll(self, image_key: str, timeout: Optional[float] = 0) -> Dict[str, Any]:
+        """
+        Status of a submitted render, optionally waiting for it to finish
+
+        Args:
+            image_key: Key returned by submit()
+            timeout: Seconds to wait (0 = check only, None = wait until done)
+
+        Returns:
+            Status dictionary; 'failed' for keys that are no longer known
+        """
+        with self._lock:
+            future = self._jobs.get(image_key)
+        if future is None:
+            return {"status": "failed", "image_key": image_key, "error": "unknown render"}
+        if timeout != 0:
+            try:
+                future.result(timeout)
+            except Exception:
+                # 시간 초과면 pending, 렌더링 오류면 failed 상태로 보고
+                pass
+        with self._lock:
+            return self._status(image_key, future)
+
+    def render(self, partner_profile: Dict[str, Any], size: Optional[Tuple[int, int]] = None,
+               timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Blocking helper for background threads: submit and wait
+
+        Returns:
+            Face result, or None if the service was busy, the render failed
+            or it did not finish within the timeout
+        """
+        status = self.submit(partner_profile, size)
+        if status["status"] == "pending":
+            status = self.poll(status["image_key"], timeout)
+        return status.get("result")
+
+    def _known(self, key: str) -> bool:
+        """
+        True if key is queued, running or done (lock held)
+
+        Failed renders and finished renders whose stored file has since been
+        evicted are forgotten, so they are rendered again.
+        """
+        future = self._jobs.get(key)
+        if future is None:
+            return False
+        if future.done() and (future.cancelled() or future.exception() is not None
+                              or not self._image_exists(future.result())):
+            del self._jobs[key]
+            return False
+        return True
+
+    @staticmethod
+    def _image_exists(result: Dict[str, Any]) -> bool:
+        """False if the result refers to a face store file that no longer exists"""
+        image = result.get("image")
+        return not isinstance(image, str) or os.path.exists(image)
+
+    def _status(self, key: str, future: Optional[Future] = None) -> Dict[str, Any]:
+        """Status of a known job (lock held)"""
+        future = future or self._jobs[key]
+        if future.cancelled():
+            return {"status": "failed", "image_key": key, "error": "cancelled"}
+        if not future.done():
+            return {"status": "pending", "image_key": key}
+        error = future.exception()
+        if error is not None:
+            return {"status": "failed", "image_key": key, "error": str(error)}
+        return {"status": "ready", "image_key": key, "result": future.result()}
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._stats["failed"] += 1
+                if not future.cancelled():
+                    print(f"Error rendering face in worker pool: {future.exception()}")
+            else:
+                self._stats["completed"] += 1
+
+    def _trim(self) -> None:
+        """Forget the oldest finished renders beyond keep_done (lock held)"""
+        done = [key for key, future in self._jobs.items() if future.done()]
+        for key in done[:max(0, len(done) - self.keep_done)]:
+            del self._jobs[key]
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of pool load and request outcomes
+
+        Returns:
+            Dictionary suitable for logging or a metrics endpoint
+        """
+        with self._lock:
+            metrics = dict(self._stats)
+            metrics["in_flight"] = self._in_flight
+        metrics["workers"] = self.workers
+        metrics["capacity"] = self.capacity
+        return metrics
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_default_service: Optional[FaceRenderService] = None
+_default_lock = threading.Lock()
+
+
+def get_face_service() -> FaceRenderService:
+    """
+    Return the process-wide render service configured from the environment
+
+    FACE_RENDER_WORKERS sets the pool size (default: up to 4 CPUs) and
+    FACE_RENDER_QUEUE the number of renders queued or running before new
+    requests are answered with "busy" (default: twice the pool size).
+    """
+    global _default_service
+    if _default_service is None:
+        with _default_lock:
+            if _default_service is None:
+                workers = int(os.getenv("FACE_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+                capacity = int(os.getenv("FACE_RENDER_QUEUE", str(workers * 2)))
+                _default_service = FaceRenderService(workers, capacity)
+    return _default_service
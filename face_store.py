@@ -0,0 +1,138 @@
+import os
+import threading
+from typing import Dict, Any, Optional
+
+
+class FaceStore:
+    """
+    Content-addressed on-disk store of rendered face images
+
+    Files are named by the render key, so identical inputs are written
+    once and shared by every session and process using the directory.
+    When the directory grows past max_bytes the least recently used files
+    (by modification time, refreshed on every hit) are removed.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            directory: Directory holding the image files
+            max_bytes: Size limit for the directory
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._size = self._scan_size()
+
+    def _scan_size(self) -> int:
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    total += entry.stat().st_size
+        return total
+
+    def path(self, key: str, extension: str = "png") -> str:
+        """File path for a key (the file may not exist)"""
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def get(self, key: str, extension: str = "png") -> Optional[str]:
+        """
+        Return the path of a stored image, or None if it is not stored
+
+        Args:
+            key: Render key
+            extension: Image file extension
+        """
+        path = self.path(key, extension)
+        try:
+            # 최근 사용 시각 갱신 (LRU 정리 기준)
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["hits"] += 1
+        return path
+
+    def put(self, key: str, data: bytes, extension: str = "png") -> str:
+        """
+        Store image bytes under a key and return the file path
+
+        Args:
+            key: Render key
+            data: Encoded image bytes
+            extension: Image file extension
+        """
+        path = self.path(key, extension)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            # 같은 키를 덮어쓰면 기존 파일 크기를 빼서 이중 계산을 막음
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            self._stats["writes"] += 1
+            self._size += len(data) - replaced
+            if self._size > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str) -> None:
+        """Remove least recently used files until under the limit (lock held)"""
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        # 다른 프로세스가 쓴 파일도 반영하도록 디렉터리 기준으로 다시 계산
+        self._size = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if self._size <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+            self._stats["evictions"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._stats)
+            metrics["bytes"] = self._size
+        metrics["max_bytes"] = self.max_bytes
+        return metrics
+
+
+_default_store: Optional[FaceStore] = None
+_default_lock = threading.Lock()
+
+
+def get_face_store() -> Optional[FaceStore]:
+    """
+    Return the process-wide store at FACE_STORE_DIR (default face_store;
+    set it to an empty string to disable), limited to FACE_STORE_BYTES
+    """
+    global _default_store
+    directory = os.getenv("FACE_STORE_DIR", "face_store")
+    if not directory:
+        return None
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                max_bytes = int(os.getenv("FACE_STORE_BYTES", str(256 * 1024 * 1024)))
+                _default_store = FaceStore(directory, max_bytes)
+    return _default_store
@@ -0,0 +1,122 @@
+import math
+from typing import List, Optional, Sequence, Union
+
+Color = Union[str, Sequence[int], None]
+
+
+def _num(value: float) -> str:
+    """Compact number formatting for SVG attributes"""
+    text = f"{value:.2f}".rstrip("0").rstrip(".")
+    return text if text not in ("", "-0") else "0"
+
+
+def svg_color(color: Color) -> str:
+    """SVG paint for a PIL-style color (hex string or RGB/RGBA tuple)"""
+    if color is None:
+        return "none"
+    if isinstance(color, str):
+        return color
+    return f"rgb({int(color[0])},{int(color[1])},{int(color[2])})"
+
+
+def _paint(fill: Color = None, outline: Color = None, width: float = 1) -> str:
+    attrs = [f'fill="{svg_color(fill)}"']
+    if fill is not None and not isinstance(fill, str) and len(fill) == 4:
+        attrs.append(f'fill-opacity="{_num(fill[3] / 255)}"')
+    if outline is not None:
+        attrs.append(f'stroke="{svg_color(outline)}" stroke-width="{_num(width)}"')
+    return " ".join(attrs)
+
+
+def _points(xy) -> List[tuple]:
+    """Accept [(x, y), ...] or a flat [x0, y0, x1, y1, ...] as ImageDraw does"""
+    xy = list(xy)
+    if xy and not isinstance(xy[0], (tuple, list)):
+        return list(zip(xy[0::2], xy[1::2]))
+    return [tuple(point) for point in xy]
+
+
+class SvgCanvas:
+    """
+    Collects SVG markup through the subset of the ImageDraw API used by
+    FaceGenerator (ellipse, polygon, rectangle, line, arc, point), so the
+    same drawing code can target either a raster image or vector output
+
+    Like ImageDraw, bounding boxes are inclusive and outlines are drawn
+    inside them.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._defs: List[str] = []
+        self._body: List[str] = []
+
+    # ImageDraw-compatible primitives
+
+    def ellipse(self, xy, fill: Color = None, outline: Color = None, width: float = 1) -> None:
+        (x0, y0), (x1, y1) = _points(xy)
+        inset = width / 2 if outline is not None else -0.5
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        rx, ry = max(0.0, (x1 - x0) / 2 - inset), max(0.0, (y1 - y0) / 2 - inset)
+        self._body.append(f'<ellipse cx="{_num(cx)}" cy="{_num(cy)}" rx="{_num(rx)}" ry="{_num(ry)}" '
+                          f'{_paint(fill, outline, width)}/>')
+
+    def polygon(self, xy, fill: Color = None, outline: Color = None, width: float = 1) -> None:
+        points = " ".join(f"{_num(x)},{_num(y)}" for x, y in _points(xy))
+        self._body.append(f'<polygon points="{points}" {_paint(fill, outline, width)}/>')
+
+    def rectangle(self, xy, fill: Color = None, outline: Color = None, width: float = 1) -> None:
+        (x0, y0), (x1, y1) = _points(xy)
+        inset = width / 2 if outline is not None else 0
+        self._body.append(
+            f'<rect x="{_num(x0 + inset)}" y="{_num(y0 + inset)}" '
+            f'width="{_num(max(0.0, x1 - x0 + 1 - 2 * inset))}" height="{_num(max(0.0, y1 - y0 + 1 - 2 * inset))}" '
+            f'{_paint(fill, outline, width)}/>'
+        )
+
+    def line(self, xy, fill: Color = None, width: float = 1, joint: Optional[str] = None) -> None:
+        points = " ".join(f"{_num(x)},{_num(y)}" for x, y in _points(xy))
+        join = ' stroke-linejoin="round"' if joint == "curve" else ""
+        self._body.append(f'<polyline points="{points}" {_paint(None, fill, width)}{join}/>')
+
+    def arc(self, xy, start: float, end: float, fill: Color = None, width: float = 1) -> None:
+        (x0, y0), (x1, y1) = _points(xy)
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        rx, ry = max(0.0, (x1 - x0) / 2 - width / 2), max(0.0, (y1 - y0) / 2 - width / 2)
+        sweep = (end - start) % 360 or 360
+        start_rad, end_rad = math.radians(start), math.radians(start + sweep)
+        sx, sy = cx + rx * math.cos(start_rad), cy + ry * math.sin(start_rad)
+        ex, ey = cx + rx * math.cos(end_rad), cy + ry * math.sin(end_rad)
+        large = 1 if sweep > 180 else 0
+        self._body.append(
+            f'<path d="M{_num(sx)},{_num(sy)} A{_num(rx)},{_num(ry)} 0 {large} 1 {_num(ex)},{_num(ey)}" '
+            f'{_paint(None, fill, width)}/>'
+        )
+
+    def point(self, xy, fill: Color = None) -> None:
+        for x, y in _points(xy if isinstance(xy, list) else [xy]):
+            self._body.append(f'<rect x="{_num(x)}" y="{_num(y)}" width="1" height="1" fill="{svg_color(fill)}"/>')
+
+    # Raw markup
+
+    def define(self, markup: str) -> None:
+        """Add a gradient, pattern or filter definition"""
+        self._defs.append(markup)
+
+    def add(self, markup: str) -> None:
+        """Add raw element markup"""
+        self._body.append(markup)
+
+    def begin_group(self, filter_id: Optional[str] = None) -> None:
+        self._body.append(f'<g filter="url(#{filter_id})">' if filter_id else "<g>")
+
+    def end_group(self) -> None:
+        self._body.append("</g>")
+
+    def tostring(self) -> str:
+        defs = f"<defs>{''.join(self._defs)}</defs>" if self._defs else ""
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+            f'viewBox="0 0 {self.width} {self.height}">{defs}{"".join(self._body)}</svg>'
+        )
@@ -15,7 +15,7 @@ class FortuneEngine:
     This is a simplified version that focuses on algorithmic storytelling without external APIs.
     """
     
-    def __init__(self):
+    def __init__(self, session_id=None):
         # Western zodiac signs and their date ranges
         self.zodiac_signs = [
             {"name": "Aries", "start_month": 3, "start_day": 21, "end_month": 4, "end_day": 19, "element": "Fire", "symbol": "♈"},
@@ -119,19 +119,22 @@ class FortuneEngine:
             # 원래 코드: self.gpt_enhancer = GPTEnhancer()
             # proxies 인자를 전달하지 않도록 명시적으로 초기화
             from gpt_enhancer import GPTEnhancer
-            self.gpt_enhancer = GPTEnhancer()
+            self.gpt_enhancer = GPTEnhancer(session_id=session_id)
             self.use_gpt = True
         except Exception as e:
             print(f"Error initializing GPT enhancer: {e}")
             self.use_gpt = False
     
-    def analyze_fortune(self, birth_date, birth_time):
+    def analyze_fortune(self, birth_date, birth_time, enhance_budget=None):
         """
         Analyze a person's fortune based on birth date and time
         
         Args:
             birth_date: datetime.date object
             birth_time: string (dawn, morning, noon, afternoon, evening)
+            enhance_budget: Optional latency budget in seconds. When set, GPT
+                sections that complete within the budget replace the template
+                story; otherwise the template story is returned as is.
             
         Returns:
             Dictionary with complete fortune analysis
@@ -160,6 +163,15 @@ class FortuneEngine:
             "story": story
         }
         
+        # Race GPT enhancement against the template story within the budget
+        if enhance_budget is not None and self.use_gpt:
+            try:
+                result["story"] = self.gpt_enhancer.enhance_fortune_reading_within(
+                    result, story, enhance_budget
+                )
+            except Exception as e:
+                print(f"Error enhancing fortune story with GPT: {e}")
+        
         return result
     
     def _calculate_western_zodiac(self, birth_date):
@@ -1,127 +1,335 @@
 import os
+import json
+import time
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
 import openai
-from openai import OpenAI
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Optional
+from openai_client import get_openai_client
+from circuit_breaker import CircuitBreaker
+from single_flight import SingleFlight, SharedResultStore
+from rate_limiter import get_rate_limiter, estimate_tokens, PRIORITY_INTERACTIVE
+from batch_pipeline import PromptStore, prompt_key
+from model_router import get_model_router
+from usage_ledger import get_usage_ledger
+
+# 호출 단위 타임아웃 및 재시도 정책
+REQUEST_TIMEOUT = 15.0      # seconds per attempt
+CALL_DEADLINE = 25.0        # seconds across all attempts of one call
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 4.0
+
+RETRYABLE_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+SYSTEM_PROMPT = "You are a poetic astrologer who blends Eastern and Western traditions. Your responses are insightful, nuanced, and spiritually resonant without being overly technical."
+MAX_TOKENS = 500
+
+# 섹션별 고정 지시문: 변하지 않는 내용이 앞에, 사용자별 값은 맨 뒤에 오도록 구성해
+# 제공자 측 프리픽스 캐시 적중률을 높임
+SECTION_PROMPTS = {
+    "personality": {
+        "max_words": 200,
+        "instructions": (
+            "Create a rich, insightful personality description for the person whose astrological "
+            "details are listed at the end. Use metaphorical language and reference both Eastern "
+            "and Western astrological traditions. Keep the response under {max_words} words and "
+            "make it personal and positive."
+        )
+    },
+    "life_path": {
+        "max_words": 200,
+        "instructions": (
+            "Describe the life journey and path for the person whose astrological influences are "
+            "listed at the end. Focus on their unique strengths, challenges they might face, and how "
+            "their astrological blueprint shapes their life trajectory. Include wisdom from both "
+            "Eastern and Western traditions. Keep the response under {max_words} words and make it inspiring."
+        )
+    },
+    "career": {
+        "max_words": 180,
+        "instructions": (
+            "Provide career guidance for the person whose astrological influences are listed at the "
+            "end. Suggest career paths, work environments, and professional strengths. Blend Eastern "
+            "and Western astrological insights into practical advice. Keep the response under "
+            "{max_words} words and make it specific and actionable."
+        )
+    },
+    "relationships": {
+        "max_words": 180,
+        "instructions": (
+            "Describe relationship patterns and romantic tendencies for the person whose astrological "
+            "influences are listed at the end. Include insights about their approach to love, "
+            "communication style, and what they need in a partner. Blend both Eastern and Western "
+            "astrological traditions. Keep the response under {max_words} words and make it "
+            "thoughtful and balanced."
+        )
+    },
+    "current_year": {
+        "max_words": 150,
+        "instructions": (
+            "Provide a forecast for the current year for the person whose astrological influences are "
+            "listed at the end. Include insights about opportunities, challenges, and important themes "
+            "for the year. Blend Eastern and Western astrological traditions. Keep the response under "
+            "{max_words} words and make it hopeful but realistic."
+        )
+    },
+    "partner_description": {
+        "max_words": 250,
+        "instructions": (
+            "Create a poetic and vivid description of an ideal romantic partner for the person whose "
+            "astrological details are listed at the end, together with the elements and personality "
+            "traits their ideal partner exhibits. Describe their presence, essence, and the feeling of "
+            "being with them. Include physical and energetic qualities without being overly specific "
+            "about exact appearance. Make the description atmospheric, inspiring, and emotionally "
+            "resonant. Blend Eastern and Western astrological traditions in your poetic description. "
+            "Keep the response under {max_words} words."
+        )
+    },
+    "meeting_scenario": {
+        "max_words": 150,
+        "instructions": (
+            "Create a vivid, romantic first meeting scenario at the location and time listed at the "
+            "end, starting from the basic situation given there. Expand this into a detailed, "
+            "atmospheric mini-story about a first encounter with destiny. Include sensory details, "
+            "emotions, and the feeling of cosmic recognition. Keep it under {max_words} words and make "
+            "it both realistic and magical."
+        )
+    },
+}
+
+# 단어 수 제한에서 섹션별 max_tokens 예산을 계산 (영어 기준 약 1.4 토큰/단어 + 여유분)
+TOKENS_PER_WORD = 1.4
+TOKEN_HEADROOM = 40
+
+
+def section_max_tokens(section: str) -> int:
+    """
+    Completion token budget for a section, derived from its word limit
+    
+    Args:
+        section: Section name from SECTION_PROMPTS
+        
+    Returns:
+        max_tokens for the section (MAX_TOKENS for unknown sections)
+    """
+    spec = SECTION_PROMPTS.get(section)
+    if spec is None:
+        return MAX_TOKENS
+    return int(spec["max_words"] * TOKENS_PER_WORD) + TOKEN_HEADROOM
+
+
+def build_prompt(section: str, details: List[tuple]) -> str:
+    """
+    Build a prefix-stable prompt: static section instructions first,
+    per-user details last
+    
+    Args:
+        section: Section name from SECTION_PROMPTS
+        details: (label, value) pairs describing the person or scenario
+        
+    Returns:
+        User prompt text
+    """
+    spec = SECTION_PROMPTS[section]
+    instructions = spec["instructions"].format(max_words=spec["max_words"])
+    lines = "\n".join(f"- {label}: {value}" for label, value in details)
+    return f"{instructions}\n\nDetails:\n{lines}"
+
+FALLBACK_TEXT = "The celestial energies are currently clouded. Trust your intuition for guidance at this time."
+
+# 공용 클라이언트를 쓰므로 서킷 브레이커도 프로세스 전체에서 공유
+_breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+_metrics_lock = threading.Lock()
+_call_metrics = {
+    "calls": 0, "retries": 0, "fallbacks": 0, "cache_hits": 0,
+    "upstream_calls": 0, "coalesced": 0, "shared_cache_hits": 0, "rate_limited": 0,
+    "store_hits": 0
+}
+
+# 계정 RPM/TPM 한도를 모든 세션이 함께 쓰도록 프로세스 공용 리미터 사용
+_limiter = get_rate_limiter()
+
+# 성공한 응답만 저장하는 프로세스 공용 LRU 캐시 (model, prompt) -> text
+RESPONSE_CACHE_SIZE = 512
+_response_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+# 동일 프롬프트 동시 요청은 한 번만 업스트림으로 보냄 (스레드 간)
+_single_flight = SingleFlight()
+
+# 선택 사항: 디렉터리를 공유하는 프로세스 간에도 파일 잠금으로 중복 제거
+_shared_cache_dir = os.getenv("GPT_SHARED_CACHE_DIR")
+_shared_store = (
+    SharedResultStore(_shared_cache_dir)
+    if _shared_cache_dir and SharedResultStore.available() else None
+)
+
+# 야간 배치로 미리 생성한 응답 저장소 (있으면 업스트림보다 먼저 조회)
+_prompt_store_path = os.getenv("GPT_PROMPT_STORE")
+_prompt_store = PromptStore(_prompt_store_path) if _prompt_store_path else None
+
+# 호출별 토큰/지연 시간 기록 (캐시 적중 포함)
+_ledger = get_usage_ledger()
+
+# 마감 시간 이후에도 백그라운드에서 끝까지 실행되어 캐시를 채우는 작업자 풀
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="gpt-enhance")
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _metrics_lock:
+        _call_metrics[name] += amount
+
+
+def _cache_get(key: tuple):
+    with _cache_lock:
+        text = _response_cache.get(key)
+        if text is not None:
+            _response_cache.move_to_end(key)
+        return text
+
+
+def _cache_put(key: tuple, text: str) -> None:
+    with _cache_lock:
+        _response_cache[key] = text
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
 
 class GPTEnhancer:
     """
     Class to enhance astrological readings using OpenAI's GPT models
     """
     
-    def __init__(self, proxies=None, **kwargs):
+    def __init__(self, proxies=None, priority: int = PRIORITY_INTERACTIVE,
+                 session_id: Optional[str] = None, **kwargs):
         """
-        Initialize the OpenAI client with API key from environment variables
+        Attach to the shared, process-wide OpenAI client
         
         Args:
             proxies: Proxy settings (ignored)
+            priority: Rate limiter priority class; background jobs such as
+                cache warming should pass rate_limiter.PRIORITY_BACKGROUND
+            session_id: App session the calls are attributed to in the usage ledger
             **kwargs: Additional arguments (ignored)
         """
         # 기본 전역 API 키 설정 (옛 방식)
         api_key = os.getenv("OPENAI_API_KEY")
         openai.api_key = api_key
         
-        # 호환성 문제를 방지하기 위해 최소한의 매개변수로 클라이언트 생성
+        # 모든 인스턴스가 하나의 커넥션 풀을 공유하도록 공용 클라이언트 사용
         try:
-            self.client = OpenAI(api_key=api_key)
+            self.client = get_openai_client()
         except TypeError as e:
             print(f"Warning: Could not initialize OpenAI client: {e}")
             self.client = None
             
-        self.model = "gpt-4.1-mini"  # Using GPT-4.1-mini for enhanced descriptions
+        self.model = "gpt-4.1-mini"  # Default model; per-section routing picks the actual model
+        self.router = get_model_router()
+        self.priority = priority
+        self.session_id = session_id
+        self._batch_pending = None
     
-    def enhance_fortune_reading(self, fortune_data: Dict[str, Any]) -> Dict[str, str]:
+    def enhance_fortune_reading(self, fortune_data: Dict[str, Any],
+                                sections: Optional[Iterable[str]] = None) -> Dict[str, str]:
         """
         Enhance the fortune reading with more detailed and poetic descriptions
         using the GPT model
         
         Args:
             fortune_data: Dictionary containing the user's fortune data
+            sections: Only enhance these sections (default: all of them)
             
         Returns:
             Dictionary with enhanced descriptions for different aspects of the reading
         """
-        western_zodiac = fortune_data.get('western_zodiac', {}).get('sign', 'Gemini')
-        chinese_zodiac = fortune_data.get('chinese_zodiac', {}).get('animal', 'Dragon')
-        elements = fortune_data.get('element_balance', {})
-        four_pillars = fortune_data.get('four_pillars', {})
-        
-        # Prepare prompt for personality description
-        personality_prompt = f"""
-        Create a rich, insightful personality description for someone born under the Western zodiac sign {western_zodiac} 
-        and the Chinese zodiac sign {chinese_zodiac}. Their dominant element is {four_pillars.get('dominant_element', 'Fire')}.
-        Use metaphorical language and reference both Eastern and Western astrological traditions.
-        Keep the response under 200 words and make it personal and positive.
+        prompts = self._fortune_prompts(fortune_data)
+        if sections is not None:
+            prompts = {section: prompts[section] for section in sections if section in prompts}
+        return {section: self._generate_text(prompt, section) for section, prompt in prompts.items()}
+    
+    def enhance_fortune_reading_within(self, fortune_data: Dict[str, Any],
+                                       template_story: Dict[str, str],
+                                       budget: float) -> Dict[str, str]:
         """
+        Race GPT enhancement against an already-complete template story
         
-        # Get personality description
-        personality = self._generate_text(personality_prompt)
-        
-        # Prepare prompt for life path
-        life_path_prompt = f"""
-        Describe the life journey and path for someone with these astrological influences:
-        - Western zodiac: {western_zodiac}
-        - Chinese zodiac: {chinese_zodiac}
-        - Elements balance: {', '.join([f"{k}: {v}%" for k, v in elements.items()][:3])}
+        All sections are requested concurrently. Sections that finish within
+        the latency budget replace their template counterparts; the rest keep
+        the template text. Calls already running when the budget expires keep
+        running in the background and land in the response cache, so the next
+        identical reading is enhanced; calls still queued are cancelled so the
+        shared pool's queue cannot grow under load.
         
-        Focus on their unique strengths, challenges they might face, and how their astrological blueprint 
-        shapes their life trajectory. Include wisdom from both Eastern and Western traditions.
-        Keep the response under 200 words and make it inspiring.
+        Args:
+            fortune_data: Dictionary containing the user's fortune data
+            template_story: Template story with the same section keys
+            budget: Latency budget in seconds
+            
+        Returns:
+            Story dictionary mixing enhanced and template sections
         """
+        story = dict(template_story)
+        if self.client is None:
+            return story
         
-        # Get life path description
-        life_path = self._generate_text(life_path_prompt)
-        
-        # Prepare prompt for career guidance
-        career_prompt = f"""
-        Provide career guidance for someone with these astrological influences:
-        - Western zodiac: {western_zodiac}
-        - Chinese zodiac: {chinese_zodiac}
-        - Dominant element: {four_pillars.get('dominant_element', 'Fire')}
-        
-        Suggest career paths, work environments, and professional strengths.
-        Blend Eastern and Western astrological insights into practical advice.
-        Keep the response under 180 words and make it specific and actionable.
+        futures = {
+            _executor.submit(self._complete, prompt, section): section
+            for section, prompt in self._fortune_prompts(fortune_data).items()
+            if section in story
+        }
+        done, not_done = wait(futures, timeout=budget)
+        for future in not_done:
+            future.cancel()
+        for future in done:
+            text = future.result()
+            if text:
+                story[futures[future]] = text
+        return story
+    
+    def _fortune_prompts(self, fortune_data: Dict[str, Any]) -> Dict[str, str]:
         """
+        Build the per-section prompts for a fortune reading
         
-        # Get career guidance
-        career = self._generate_text(career_prompt)
-        
-        # Prepare prompt for relationships
-        relationships_prompt = f"""
-        Describe relationship patterns and romantic tendencies for someone with:
-        - Western zodiac: {western_zodiac}
-        - Chinese zodiac: {chinese_zodiac}
-        - Elements balance: {', '.join([f"{k}: {v}%" for k, v in elements.items()][:3])}
-        
-        Include insights about their approach to love, communication style, and what they need in a partner.
-        Blend both Eastern and Western astrological traditions.
-        Keep the response under 180 words and make it thoughtful and balanced.
+        Args:
+            fortune_data: Dictionary containing the user's fortune data
+            
+        Returns:
+            Dictionary mapping story section names to prompts
         """
+        western_zodiac = fortune_data.get('western_zodiac', {}).get('sign', 'Gemini')
+        chinese_zodiac = fortune_data.get('chinese_zodiac', {}).get('animal', 'Dragon')
+        elements = fortune_data.get('element_balance', {})
+        four_pillars = fortune_data.get('four_pillars', {})
         
-        # Get relationships description
-        relationships = self._generate_text(relationships_prompt)
-        
-        # Prepare prompt for current year
-        current_year_prompt = f"""
-        Provide a forecast for the current year for someone with:
-        - Western zodiac: {western_zodiac}
-        - Chinese zodiac: {chinese_zodiac}
-        - Dominant element: {four_pillars.get('dominant_element', 'Fire')}
-        
-        Include insights about opportunities, challenges, and important themes for the year.
-        Blend Eastern and Western astrological traditions.
-        Keep the response under 150 words and make it hopeful but realistic.
-        """
+        dominant_element = four_pillars.get('dominant_element', 'Fire')
+        elements_balance = ', '.join([f"{k}: {v}%" for k, v in elements.items()][:3])
         
-        # Get current year forecast
-        current_year = self._generate_text(current_year_prompt)
+        with_dominant = [
+            ("Western zodiac", western_zodiac),
+            ("Chinese zodiac", chinese_zodiac),
+            ("Dominant element", dominant_element)
+        ]
+        with_balance = [
+            ("Western zodiac", western_zodiac),
+            ("Chinese zodiac", chinese_zodiac),
+            ("Elements balance", elements_balance)
+        ]
         
         return {
-            "personality": personality,
-            "life_path": life_path,
-            "career": career,
-            "relationships": relationships,
-            "current_year": current_year
+            "personality": build_prompt("personality", with_dominant),
+            "life_path": build_prompt("life_path", with_balance),
+            "career": build_prompt("career", with_dominant),
+            "relationships": build_prompt("relationships", with_balance),
+            "current_year": build_prompt("current_year", with_dominant)
         }
     
     def enhance_partner_description(self, user_fortune: Dict[str, Any], 
@@ -146,23 +354,15 @@ class GPTEnhancer:
                                           ['Creative', 'Intuitive', 'Compassionate'])
         
         # Prepare prompt
-        prompt = f"""
-        Create a poetic and vivid description of an ideal romantic partner for someone with:
-        - Western zodiac: {user_western}
-        - Chinese zodiac: {user_chinese}
-        - Dominant element: {user_element}
-        
-        Their ideal partner exhibits these elements: {', '.join(partner_elements[:2])}
-        And these personality traits: {', '.join(partner_traits[:5])}
+        prompt = build_prompt("partner_description", [
+            ("Western zodiac", user_western),
+            ("Chinese zodiac", user_chinese),
+            ("Dominant element", user_element),
+            ("Ideal partner's elements", ', '.join(partner_elements[:2])),
+            ("Ideal partner's personality traits", ', '.join(partner_traits[:5]))
+        ])
         
-        Describe their presence, essence, and the feeling of being with them. Include physical and
-        energetic qualities without being overly specific about exact appearance.
-        Make the description atmospheric, inspiring, and emotionally resonant.
-        Blend Eastern and Western astrological traditions in your poetic description.
-        Keep the response under 250 words.
-        """
-        
-        return self._generate_text(prompt)
+        return self._generate_text(prompt, "partner_description")
     
     def enhance_meeting_scenarios(self, scenarios: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """
@@ -182,17 +382,14 @@ class GPTEnhancer:
             situation = scenario.get('situation', 'a chance encounter')
             
             # Prepare prompt
-            prompt = f"""
-            Create a vivid, romantic first meeting scenario that happens at {location} during {time}.
-            The basic situation is: {situation}
-            
-            Expand this into a detailed, atmospheric mini-story about a first encounter with destiny.
-            Include sensory details, emotions, and the feeling of cosmic recognition.
-            Keep it under 150 words and make it both realistic and magical.
-            """
+            prompt = build_prompt("meeting_scenario", [
+                ("Location", location),
+                ("Time", time),
+                ("Basic situation", situation)
+            ])
             
             # Get enhanced description
-            enhanced_description = self._generate_text(prompt)
+            enhanced_description = self._generate_text(prompt, "meeting_scenario")
             
             # Create enhanced scenario
             enhanced_scenarios.append({
@@ -207,35 +404,277 @@ class GPTEnhancer:
         
         return enhanced_scenarios
     
-    def _generate_text(self, prompt: str) -> str:
+    @contextmanager
+    def batch_mode(self):
+        """
+        Collect prompts for offline batch execution instead of calling upstream
+        
+        Inside the block, enhancer methods return fallback text for anything
+        not already cached and record the request under its idempotent key,
+        even if it is already stored. Pass the collected requests to
+        batch_pipeline.run_batch, which skips entries that are still fresh.
+        
+        Yields:
+            Dictionary of pending batch requests keyed by prompt key
+        """
+        pending = {}
+        self._batch_pending = pending
+        try:
+            yield pending
+        finally:
+            self._batch_pending = None
+    
+    @staticmethod
+    def get_metrics() -> Dict[str, Any]:
+        """
+        Snapshot of call, retry and circuit breaker metrics for this process
+        
+        Returns:
+            Dictionary with call counters and the breaker state
+        """
+        with _metrics_lock:
+            metrics = dict(_call_metrics)
+        metrics["circuit_breaker"] = _breaker.metrics()
+        metrics["rate_limiter"] = _limiter.metrics()
+        metrics["model_router"] = get_model_router().metrics()
+        return metrics
+    
+    def _generate_text(self, prompt: str, section: Optional[str] = None) -> str:
         """
         Generate text using the OpenAI GPT model
         
         Args:
             prompt: The prompt to send to the model
+            section: Section name used for model routing and the token budget
             
         Returns:
-            Generated text
+            Generated text, or a fallback message if generation failed
         """
+        # 클라이언트 객체가 없는 경우 대체 응답 반환
+        if self.client is None:
+            return "The celestial energies are currently in transition. Trust your intuition at this time."
+        
+        text = self._complete(prompt, section)
+        if text is None:
+            if self._batch_pending is None:
+                _count("fallbacks")
+            return FALLBACK_TEXT
+        return text
+    
+    def _complete(self, prompt: str, section: Optional[str] = None):
+        """
+        Return the model's completion for a prompt, or None on failure
+        
+        Every call, including cache hits, is appended to the usage ledger
+        with its outcome, latency and token usage.
+        
+        Args:
+            prompt: The prompt to send to the model
+            section: Section name used for model routing and the token budget
+            
+        Returns:
+            Generated text, or None if no completion could be obtained
+        """
+        if self.client is None:
+            return None
+        
+        started = time.monotonic()
+        info = {"model": None, "outcome": "error", "attempts": 0,
+                "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
         try:
-            # 클라이언트 객체가 없는 경우 대체 응답 반환
-            if self.client is None:
-                return "The celestial energies are currently in transition. Trust your intuition at this time."
-                
-            # Call the OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a poetic astrologer who blends Eastern and Western traditions. Your responses are insightful, nuanced, and spiritually resonant without being overly technical."},
+            return self._resolve(prompt, section, info)
+        finally:
+            if _ledger is not None:
+                _ledger.record(self.session_id, section, info["model"], info["outcome"],
+                               time.monotonic() - started, info["attempts"], info["prompt_tokens"],
+                               info["cached_tokens"], info["completion_tokens"],
+                               info.get("tier"), info.get("preferred_tier"))
+    
+    def _resolve(self, prompt: str, section: Optional[str], info: Dict[str, Any]):
+        """
+        Resolve a prompt through the caches, the prompt store and upstream
+        
+        Successful responses are cached per (model, prompt), results ingested
+        from offline batches are read from the prompt store before calling
+        upstream, and concurrent identical prompts are coalesced into a
+        single upstream call.
+        
+        Args:
+            prompt: The prompt to send to the model
+            section: Section name used for model routing and the token budget
+            info: Call record filled in with model, routing tiers, outcome and token usage
+            
+        Returns:
+            Generated text, or None if no completion could be obtained
+        """
+        _count("calls")
+        # 배치는 지연 시간과 무관하므로 항상 선호 티어를 사용
+        model = self.router.route(section, latency_sensitive=self._batch_pending is None, decision=info)
+        info["model"] = model
+        cache_key = (model, prompt)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            _count("cache_hits")
+            info["outcome"] = "cache_hit"
+            return cached
+        
+        # 배치 결과는 선호 티어 모델로 저장되므로 지연 시간 때문에 하위 티어로
+        # 내려간 경우에도 선호 티어 키로 조회
+        store_key = prompt_key(self.router.preferred_model(section), SYSTEM_PROMPT, prompt)
+        # 배치 수집 중에는 저장 여부와 무관하게 기록 (오래된 항목 판단은 run_batch가 담당)
+        if _prompt_store is not None and self._batch_pending is None:
+            stored = _prompt_store.get(store_key)
+            if stored is not None:
+                _count("store_hits")
+                info["outcome"] = "store_hit"
+                _cache_put(cache_key, stored)
+                return stored
+        
+        if self._batch_pending is not None:
+            self._batch_pending[store_key] = {
+                "custom_id": store_key,
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=500,
-                temperature=0.7
-            )
-            
-            # Return the generated text
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            # In case of any errors with the API, return a fallback response
-            print(f"Error generating text with OpenAI: {e}")
-            return "The celestial energies are currently clouded. Trust your intuition for guidance at this time." 
\ No newline at end of file
+                "max_tokens": section_max_tokens(section),
+                "temperature": 0.7
+            }
+            info["outcome"] = "batch_queued"
+            return None
+        
+        text, shared = _single_flight.do(cache_key, lambda: self._fetch(prompt, section, model, cache_key, info))
+        if shared:
+            _count("coalesced")
+            info["outcome"] = "coalesced"
+        return text
+    
+    def _fetch(self, prompt: str, section: Optional[str], model: str,
+               cache_key: tuple, info: Dict[str, Any]):
+        """
+        Leader path of a coalesced call: consult the cross-process store
+        (if configured) under its per-key lock, then call upstream
+        
+        Args:
+            prompt: The prompt to send to the model
+            section: Section name used for the token budget
+            model: Routed model to call
+            cache_key: (model, prompt) key for the caches
+            info: Call record filled in with outcome and token usage
+            
+        Returns:
+            Generated text, or None if no completion could be obtained
+        """
+        if _shared_store is None:
+            text = self._call_upstream(prompt, section, model, info)
+        else:
+            store_key = json.dumps(cache_key)
+            with _shared_store.lock(store_key):
+                text = _shared_store.get(store_key)
+                if text is not None:
+                    _count("shared_cache_hits")
+                    info["outcome"] = "shared_cache_hit"
+                else:
+                    text = self._call_upstream(prompt, section, model, info)
+                    if text is not None:
+                        _shared_store.put(store_key, text)
+        
+        if text is not None:
+            _cache_put(cache_key, text)
+        return text
+    
+    def _call_upstream(self, prompt: str, section: Optional[str], model: str,
+                       info: Dict[str, Any]):
+        """
+        Call the chat completions API with timeouts, retries and the breaker
+        
+        Each attempt waits for RPM/TPM capacity and has its own timeout,
+        retryable errors are retried with jittered exponential backoff inside
+        an overall deadline, and a shared circuit breaker short-circuits
+        during upstream incidents.
+        
+        Args:
+            prompt: The prompt to send to the model
+            section: Section name used for the token budget
+            model: Routed model to call
+            info: Call record filled in with outcome, attempts and token usage
+            
+        Returns:
+            Generated text, or None if the call failed
+        """
+        if not _breaker.allow_request():
+            info["outcome"] = "breaker_open"
+            return None
+        
+        try:
+            max_tokens = section_max_tokens(section)
+        
+            deadline = time.monotonic() + CALL_DEADLINE
+            attempt = 0
+            while True:
+                # 계정 한도 내에서만 호출하고, 마감 시간 안에 자리가 나지 않으면 포기
+                if not _limiter.acquire(estimate_tokens(SYSTEM_PROMPT + prompt, max_tokens),
+                                        self.priority, timeout=max(0.0, deadline - time.monotonic())):
+                    _count("rate_limited")
+                    info["outcome"] = "rate_limited"
+                    return None
+            
+                remaining = deadline - time.monotonic()
+                started = time.monotonic()
+                try:
+                    _count("upstream_calls")
+                    info["attempts"] += 1
+                    # Call the OpenAI API (SDK retries disabled; the loop below owns retry policy)
+                    response = self.client.with_options(
+                        timeout=min(REQUEST_TIMEOUT, max(remaining, 0.1)),
+                        max_retries=0
+                    ).chat.completions.create(
+                        model=model,
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt}
+                        ],
+                        max_tokens=max_tokens,
+                        temperature=0.7
+                    )
+                    _breaker.record_success()
+                    self.router.record(model, time.monotonic() - started)
+                
+                    usage = response.usage
+                    if usage is not None:
+                        info["prompt_tokens"] = usage.prompt_tokens
+                        info["completion_tokens"] = usage.completion_tokens
+                        details = getattr(usage, "prompt_tokens_details", None)
+                        info["cached_tokens"] = getattr(details, "cached_tokens", None) or 0
+                    content = response.choices[0].message.content
+                    # 내용 없는 응답(필터 등)은 업스트림 장애가 아니므로 대체 텍스트로 처리
+                    info["outcome"] = "ok" if content is not None else "empty"
+                    return content.strip() if content is not None else None
+                except RETRYABLE_ERRORS as e:
+                    # 타임아웃 등 실패한 시도도 해당 티어의 지연 시간 신호로 기록
+                    self.router.record(model, time.monotonic() - started)
+                    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)) * random.uniform(0.5, 1.0)
+                    if attempt >= MAX_RETRIES or time.monotonic() + delay >= deadline:
+                        print(f"Error generating text with OpenAI (giving up after {attempt + 1} attempts): {e}")
+                        _breaker.record_failure()
+                        info["outcome"] = "failed"
+                        return None
+                    attempt += 1
+                    _count("retries")
+                    time.sleep(delay)
+                except openai.BadRequestError as e:
+                    # 요청 자체의 문제이므로 업스트림 장애로 집계하지 않음
+                    print(f"Error generating text with OpenAI: {e}")
+                    info["outcome"] = "bad_request"
+                    return None
+                except Exception as e:
+                    # In case of any other errors with the API, give up on this prompt
+                    print(f"Error generating text with OpenAI: {e}")
+                    _breaker.record_failure()
+                    info["outcome"] = "failed"
+                    return None
+        finally:
+            # 결과를 기록하지 않고 끝난 경로(잘못된 요청, 한도 대기 시간 초과)에서도
+            # half-open 시험 호출을 반납해 브레이커가 멈추지 않게 함
+            _breaker.release()
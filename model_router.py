@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+# 모델 티어: 품질 순서대로 나열 (뒤로 갈수록 빠르고 저렴)
+TIER_ORDER = ["quality", "balanced", "fast"]
+
+DEFAULT_TIERS = {
+    "quality": {"model": "gpt-4.1", "slo": 8.0},
+    "balanced": {"model": "gpt-4.1-mini", "slo": 5.0},
+    "fast": {"model": "gpt-4.1-nano", "slo": 3.0},
+}
+
+# 섹션별 기본 티어: 모두 기존 모델(gpt-4.1-mini)을 사용하며,
+# 다른 티어로의 변경은 GPT_SECTION_TIERS로 명시적으로 선택
+# (예: {"partner_description": "quality", "meeting_scenario": "fast"})
+DEFAULT_SECTION_TIERS = {
+    "personality": "balanced",
+    "life_path": "balanced",
+    "career": "balanced",
+    "relationships": "balanced",
+    "current_year": "balanced",
+    "partner_description": "balanced",
+    "meeting_scenario": "balanced",
+}
+DEFAULT_TIER = "balanced"
+
+
+class ModelRouter:
+    """
+    Map each enhancer section to a model tier, downgrading to a faster tier
+    while the rolling latency of the preferred tier exceeds its SLO
+
+    Latency samples expire after window_seconds, so a downgraded tier is
+    tried again once its slow samples have aged out.
+    """
+
+    def __init__(self, tiers: Optional[Dict[str, Dict[str, Any]]] = None,
+                 section_tiers: Optional[Dict[str, str]] = None,
+                 window_seconds: float = 120.0, min_samples: int = 5,
+                 percentile: float = 90.0):
+        """
+        Args:
+            tiers: Tier name -> {"model": str, "slo": seconds}
+            section_tiers: Section name -> preferred tier name
+            window_seconds: Age limit for latency samples
+            min_samples: Samples required before a tier can be judged slow
+            percentile: Rolling latency percentile compared with the SLO
+        """
+        self.tiers = tiers or DEFAULT_TIERS
+        self.section_tiers = section_tiers or DEFAULT_SECTION_TIERS
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.percentile = percentile
+
+        self._lock = threading.Lock()
+        self._samples = {tier: deque() for tier in self.tiers}
+        self._model_tiers = {spec["model"]: tier for tier, spec in self.tiers.items()}
+        self._decisions = {"routed": 0, "downgraded": 0}
+
+    def _rolling_latency(self, tier: str) -> Optional[float]:
+        """Rolling latency percentile for a tier, or None with too few samples (lock held)"""
+        samples = self._samples[tier]
+        cutoff = time.monotonic() - self.window_seconds
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+        if len(samples) < self.min_samples:
+            return None
+        ordered = sorted(latency for _, latency in samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100.0))
+        return ordered[index]
+
+    def _preferred_tier(self, section: Optional[str]) -> str:
+        preferred = self.section_tiers.get(section, DEFAULT_TIER)
+        return preferred if preferred in self.tiers else DEFAULT_TIER
+
+    def preferred_model(self, section: Optional[str]) -> str:
+        """
+        Model of the section's preferred tier, ignoring any latency downgrade
+
+        Args:
+            section: Enhancer section name
+
+        Returns:
+            Model name
+        """
+        return self.tiers[self._preferred_tier(section)]["model"]
+
+    def route(self, section: Optional[str], latency_sensitive: bool = True,
+              decision: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Choose the model for a section
+
+        Args:
+            section: Enhancer section name
+            latency_sensitive: False for offline work (e.g. batches), which
+                always uses the preferred tier
+            decision: Optional dictionary filled in with the chosen "tier" and
+                the "preferred_tier", e.g. for the usage ledger
+
+        Returns:
+            Model name to call
+        """
+        preferred = self._preferred_tier(section)
+        chosen = preferred
+
+        with self._lock:
+            if latency_sensitive:
+                order = TIER_ORDER[TIER_ORDER.index(preferred):] if preferred in TIER_ORDER else [preferred]
+                candidates = [tier for tier in order if tier in self.tiers]
+                for tier in candidates:
+                    chosen = tier
+                    rolling = self._rolling_latency(tier)
+                    if rolling is None or rolling <= self.tiers[tier]["slo"]:
+                        break
+            self._decisions["routed"] += 1
+            if chosen != preferred:
+                self._decisions["downgraded"] += 1
+
+        if decision is not None:
+            decision["tier"] = chosen
+            decision["preferred_tier"] = preferred
+        return self.tiers[chosen]["model"]
+
+    def record(self, model: str, latency: float) -> None:
+        """
+        Record an upstream call latency for the tier serving the model
+
+        Args:
+            model: Model that served the call
+            latency: Seconds the call took
+        """
+        tier = self._model_tiers.get(model)
+        if tier is None:
+            return
+        with self._lock:
+            self._samples[tier].append((time.monotonic(), latency))
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of rolling latency per tier and routing counters
+
+        Returns:
+            Dictionary suitable for logging or a metrics endpoint
+        """
+        with self._lock:
+            tiers = {}
+            for tier, spec in self.tiers.items():
+                rolling = self._rolling_latency(tier)
+                tiers[tier] = {
+                    "model": spec["model"],
+                    "slo": spec["slo"],
+                    "samples": len(self._samples[tier]),
+                    "rolling_latency": rolling,
+                    "over_slo": rolling is not None and rolling > spec["slo"]
+                }
+            return {"tiers": tiers, "decisions": dict(self._decisions)}
+
+
+_default_router: Optional[ModelRouter] = None
+_default_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """
+    Return the process-wide router
+
+    GPT_SECTION_TIERS may hold a JSON object overriding section -> tier,
+    and GPT_TIER_MODELS a JSON object overriding tier -> model.
+    """
+    global _default_router
+    if _default_router is None:
+        with _default_lock:
+            if _default_router is None:
+                tiers = {tier: dict(spec) for tier, spec in DEFAULT_TIERS.items()}
+                for tier, model in json.loads(os.getenv("GPT_TIER_MODELS", "{}")).items():
+                    if tier in tiers:
+                        tiers[tier]["model"] = model
+                section_tiers = dict(DEFAULT_SECTION_TIERS)
+                section_tiers.update(json.loads(os.getenv("GPT_SECTION_TIERS", "{}")))
+                _default_router = ModelRouter(tiers, section_tiers)
+    return _default_router
@@ -0,0 +1,108 @@
+import os
+import importlib.util
+import threading
+from typing import Optional
+
+import httpx
+from openai import OpenAI
+
+# 프로세스 전체에서 공유하는 커넥션 풀 설정
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "50"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "120"))
+CONNECT_TIMEOUT = 5.0
+DEFAULT_TIMEOUT = 60.0
+
+_client: Optional[OpenAI] = None
+_http_client: Optional[httpx.Client] = None
+_lock = threading.RLock()
+
+
+def _http2_available() -> bool:
+    """HTTP/2 requires the optional 'h2' package"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Return the process-wide httpx client backing every OpenAI call
+
+    Returns:
+        Shared httpx.Client with a tuned keep-alive connection pool
+    """
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    http2=_http2_available(),
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY
+                    ),
+                    timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT)
+                )
+    return _http_client
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Return the process-wide OpenAI client, creating it on first use
+
+    All callers share a single connection pool, so TLS handshakes happen
+    once per connection instead of once per GPTEnhancer instance.
+
+    Returns:
+        Shared OpenAI client
+
+    Raises:
+        openai.OpenAIError: If no API key is configured
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    base_url=os.getenv("OPENAI_BASE_URL") or None,
+                    http_client=get_http_client()
+                )
+    return _client
+
+
+def warm_up_client() -> Optional[threading.Thread]:
+    """
+    Open a pooled connection to the API host in the background
+
+    The first user request then reuses an already-established TLS
+    connection instead of paying the handshake on the request path.
+
+    Returns:
+        The warm-up thread, or None if the client could not be created
+    """
+    try:
+        client = get_openai_client()
+    except Exception as e:
+        print(f"Warning: Could not warm up OpenAI client: {e}")
+        return None
+
+    def _warm():
+        try:
+            get_http_client().head(str(client.base_url), timeout=CONNECT_TIMEOUT)
+        except httpx.HTTPError:
+            pass
+
+    thread = threading.Thread(target=_warm, name="openai-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def reset_openai_client() -> None:
+    """Close and discard the shared client (e.g. after changing the API key)"""
+    global _client, _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _client = None
+        _http_client = None
@@ -6,7 +6,7 @@ from gpt_enhancer import GPTEnhancer
 class PartnerMatcher:
     """Class for matching compatible partners based on astrological profiles."""
     
-    def __init__(self):
+    def __init__(self, session_id=None):
         # Element relationships (promoting, controlling)
         self.element_relationships = {
             "Wood": {"promotes": "Fire", "controls": "Earth", "is_controlled_by": "Metal"},
@@ -80,7 +80,7 @@ class PartnerMatcher:
             # 원래 코드: self.gpt_enhancer = GPTEnhancer()
             # proxies 인자를 전달하지 않도록 명시적으로 초기화
             from gpt_enhancer import GPTEnhancer
-            self.gpt_enhancer = GPTEnhancer()
+            self.gpt_enhancer = GPTEnhancer(session_id=session_id)
             self.use_gpt = True
         except Exception as e:
             print(f"Error initializing GPT enhancer: {e}")
@@ -0,0 +1,200 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from partner_matcher import PartnerMatcher
+from face_service import get_face_service
+
+# 파트너 프로필의 투기적 계산은 GPT 호출 비용이 들므로 기본적으로 꺼 둠
+PREFETCH_PARTNER = os.getenv("PREFETCH_PARTNER", "0") == "1"
+# 대기 중이거나 실행 중인 투기적 작업의 최대 개수 (넘치면 투기적 실행을 건너뜀)
+PREFETCH_QUEUE = int(os.getenv("PREFETCH_QUEUE", "8"))
+
+# 모든 세션이 공유하는 투기적 실행용 작업자 풀
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+_slots = threading.BoundedSemaphore(PREFETCH_QUEUE)
+
+
+def _submit(fn: Callable, *args) -> Optional[Future]:
+    """Queue speculative work, or return None if PREFETCH_QUEUE jobs are already queued or running"""
+    if not _slots.acquire(blocking=False):
+        return None
+    future = _executor.submit(fn, *args)
+    # 취소된 작업도 콜백이 호출되므로 슬롯이 항상 반환됨
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def _claim(future: Future) -> bool:
+    """
+    Decide whether a caller should wait for a speculative future
+
+    A job that has not started yet is cancelled so the caller computes the
+    result inline instead of waiting behind other sessions' work.
+    """
+    if future.done() or future.running():
+        return True
+    return not future.cancel()
+
+
+class SpeculativePrefetcher:
+    """
+    Run the next steps of the fixed app flow in the background
+
+    After a fortune reading, the partner profile (including its GPT
+    enhancement) can be computed speculatively, and once a profile is ready
+    the face is pre-rendered. Results are keyed by the inputs they were
+    computed from; starting a new key or calling cancel() discards earlier
+    work. Speculative work is skipped while the shared queue is full, and
+    work that has not started when it is needed is cancelled and computed
+    by the caller.
+    """
+
+    def __init__(self, session_id: Optional[str] = None, speculate_partner: bool = PREFETCH_PARTNER):
+        """
+        Args:
+            session_id: App session that GPT calls are attributed to
+            speculate_partner: Compute the partner profile right after a
+                fortune reading (costs GPT calls for users who never open
+                the partner tab; default PREFETCH_PARTNER=1)
+        """
+        self.session_id = session_id
+        self.speculate_partner = speculate_partner
+        self._lock = threading.Lock()
+        self._key: Optional[Hashable] = None
+        self._generation = 0
+        self._partner: Optional[Future] = None
+        self._face: Optional[Future] = None
+        self._face_partner: Optional[Dict[str, Any]] = None
+
+    @property
+    def key(self) -> Optional[Hashable]:
+        return self._key
+
+    def start(self, key: Hashable, fortune_result: Dict[str, Any]) -> None:
+        """
+        Begin prefetching the partner profile and face for a fortune result
+
+        Without speculate_partner this only records the key, and the face
+        is prefetched once the caller supplies a profile (prefetch_face).
+
+        Args:
+            key: Identifies the inputs (e.g. birth date and time)
+            fortune_result: Output of FortuneEngine.analyze_fortune
+        """
+        with self._lock:
+            self._discard()
+            self._key = key
+            if self.speculate_partner:
+                self._partner = _submit(self._find_partner, self._generation, fortune_result)
+
+    def prefetch_face(self, key: Hashable, fortune_result: Dict[str, Any],
+                      partner_profile: Dict[str, Any]) -> None:
+        """
+        Pre-render the face for a partner profile computed outside the prefetcher
+
+        Args:
+            key: Identifies the inputs the profile was computed from
+            fortune_result: User's fortune data
+            partner_profile: Partner profile shown to the user
+        """
+        with self._lock:
+            if key != self._key:
+                self._discard()
+                self._key = key
+            if self._face_partner is partner_profile:
+                return
+            self._submit_face(self._generation, fortune_result, partner_profile)
+
+    def take_partner(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        Return the prefetched partner profile, waiting only if it is already running
+
+        The prefetched profile is handed out once; later calls return None.
+        A job still waiting in the queue is cancelled and None is returned,
+        so the caller computes the profile itself.
+
+        Args:
+            key: Inputs the caller needs a profile for
+
+        Returns:
+            Partner profile, or None if nothing usable was prefetched
+        """
+        with self._lock:
+            future = self._partner if key == self._key else None
+            # 한 번만 사용: 다시 누르면 새 파트너를 계산
+            self._partner = None
+        if future is None or not _claim(future):
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error in speculative partner matching: {e}")
+            return None
+
+    def take_face(self, key: Hashable, partner_profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Return the pre-rendered face if it was made for this exact profile
+
+        As with take_partner, a render that has not started is cancelled
+        and None is returned instead of waiting for it.
+
+        Args:
+            key: Inputs the caller needs a face for
+            partner_profile: Partner profile currently shown to the user
+
+        Returns:
+            Face result, or None if nothing usable was prefetched
+        """
+        with self._lock:
+            usable = key == self._key and self._face_partner is partner_profile
+            future = self._face if usable else None
+        if future is None or not _claim(future):
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error in speculative face generation: {e}")
+            return None
+
+    def cancel(self) -> None:
+        """Discard all speculative work (e.g. when the user changes inputs)"""
+        with self._lock:
+            self._discard()
+
+    def _discard(self) -> None:
+        """Cancel pending futures and invalidate running ones (lock held)"""
+        self._generation += 1
+        for future in (self._partner, self._face):
+            if future is not None:
+                future.cancel()
+        self._key = None
+        self._partner = None
+        self._face = None
+        self._face_partner = None
+
+    def _submit_face(self, generation: int, fortune_result: Dict[str, Any],
+                     partner_profile: Dict[str, Any]) -> None:
+        """Queue a face render for the profile (lock held)"""
+        if self._face is not None:
+            self._face.cancel()
+        self._face = _submit(self._render_face, generation, fortune_result, partner_profile)
+        self._face_partner = partner_profile if self._face is not None else None
+
+    def _find_partner(self, generation: int, fortune_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if generation != self._generation:
+            return None
+        partner_profile = PartnerMatcher(session_id=self.session_id).find_ideal_partner(fortune_result)
+        # 파트너가 준비되면 바로 얼굴도 미리 생성
+        with self._lock:
+            if generation == self._generation:
+                self._submit_face(generation, fortune_result, partner_profile)
+        return partner_profile
+
+    def _render_face(self, generation: int, fortune_result: Dict[str, Any],
+                     partner_profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if generation != self._generation:
+            return None
+        # 렌더 풀이 가득 차 있으면 투기적 렌더링은 포기 (사용자가 요청하면 다시 제출)
+        return get_face_service().render(partner_profile)
@@ -0,0 +1,221 @@
+import os
+import json
+import heapq
+import itertools
+import time
+import threading
+from typing import Dict, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-process state is unavailable
+    fcntl = None
+
+# 우선순위 클래스 (작을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+def estimate_tokens(text: str, max_completion_tokens: int = 0) -> int:
+    """
+    Rough token estimate used for TPM accounting (about 4 characters per token)
+
+    Args:
+        text: Prompt text sent to the model
+        max_completion_tokens: Completion budget reserved for the response
+
+    Returns:
+        Estimated total tokens for the request
+    """
+    return len(text) // 4 + 1 + max_completion_tokens
+
+
+class TokenBucketLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter with priority classes
+
+    Two token buckets refill continuously. Waiters queue by (priority,
+    arrival order) and only the head of the queue may consume, so
+    interactive requests overtake queued background work. When state_path
+    is given, bucket levels live in a flock-protected file so every process
+    on the host draws from the same budget.
+    """
+
+    def __init__(self, rpm: int, tpm: int, state_path: Optional[str] = None):
+        """
+        Args:
+            rpm: Requests per minute allowed for the account
+            tpm: Tokens per minute allowed for the account
+            state_path: Optional file for sharing bucket state across processes
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.state_path = state_path if state_path and fcntl is not None else None
+
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+
+        self._wait_stats = {
+            name: {"acquired": 0, "timeouts": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+
+    def _refill(self, requests: float, tokens: float, elapsed: float):
+        requests = min(float(self.rpm), requests + elapsed * self.rpm / 60.0)
+        tokens = min(float(self.tpm), tokens + elapsed * self.tpm / 60.0)
+        return requests, tokens
+
+    def _shortfall_delay(self, requests: float, tokens: float, needed: int) -> float:
+        """Seconds until both buckets can cover the request"""
+        wait_requests = max(0.0, 1 - requests) * 60.0 / self.rpm
+        wait_tokens = max(0.0, needed - tokens) * 60.0 / self.tpm
+        return max(wait_requests, wait_tokens)
+
+    def _try_consume_local(self, needed: int) -> float:
+        now = time.monotonic()
+        self._requests, self._tokens = self._refill(self._requests, self._tokens, now - self._updated)
+        self._updated = now
+        if self._requests >= 1 and self._tokens >= needed:
+            self._requests -= 1
+            self._tokens -= needed
+            return 0.0
+        return self._shortfall_delay(self._requests, self._tokens, needed)
+
+    def _try_consume_shared(self, needed: int) -> float:
+        with open(self.state_path, "a+") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                except ValueError:
+                    state = {}
+                now = time.time()
+                requests, tokens = self._refill(
+                    state.get("requests", float(self.rpm)),
+                    state.get("tokens", float(self.tpm)),
+                    max(0.0, now - state.get("updated", now))
+                )
+                delay = self._shortfall_delay(requests, tokens, needed)
+                if requests >= 1 and tokens >= needed:
+                    requests -= 1
+                    tokens -= needed
+                    delay = 0.0
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({"requests": requests, "tokens": tokens, "updated": now}))
+                f.flush()
+                return delay
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def acquire(self, tokens: int, priority: int = PRIORITY_INTERACTIVE,
+                timeout: Optional[float] = None) -> bool:
+        """
+        Block until one request and the estimated tokens are available
+
+        Args:
+            tokens: Estimated tokens for the request (prompt + completion)
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if capacity was acquired, False if the timeout expired
+        """
+        # 버킷 용량보다 큰 요청이 영원히 대기하지 않도록 제한
+        needed = min(tokens, self.tpm)
+        stats = self._wait_stats[PRIORITY_NAMES.get(priority, "background")]
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        entry = (priority, next(self._seq))
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    delay = None
+                    if self._waiters[0] == entry:
+                        if self.state_path is not None:
+                            # 파일 잠금은 다른 프로세스 때문에 오래 걸릴 수 있으므로
+                            # 조건 변수 잠금을 놓고 수행 (대기열 선두 자리는 유지됨)
+                            self._cond.release()
+                            try:
+                                delay = self._try_consume_shared(needed)
+                            finally:
+                                self._cond.acquire()
+                        else:
+                            delay = self._try_consume_local(needed)
+                        if delay == 0.0:
+                            waited = time.monotonic() - start
+                            stats["acquired"] += 1
+                            stats["total_wait"] += waited
+                            stats["max_wait"] = max(stats["max_wait"], waited)
+                            return True
+
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        stats["timeouts"] += 1
+                        return False
+                    # 대기열 선두는 보충 시간만큼, 나머지는 알림이 올 때까지 대기
+                    sleep_for = delay if delay is not None else remaining
+                    if remaining is not None and sleep_for is not None:
+                        sleep_for = min(sleep_for, remaining)
+                    self._cond.wait(sleep_for)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of queue depth and queue wait time per priority class
+
+        Returns:
+            Dictionary suitable for logging or a metrics endpoint
+        """
+        with self._cond:
+            per_class = {}
+            for name, stats in self._wait_stats.items():
+                per_class[name] = dict(stats)
+                per_class[name]["avg_wait"] = (
+                    stats["total_wait"] / stats["acquired"] if stats["acquired"] else 0.0
+                )
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "queued": len(self._waiters),
+                "shared": self.state_path is not None,
+                "wait": per_class
+            }
+
+
+_default_limiter: Optional[TokenBucketLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucketLimiter:
+    """
+    Return the process-wide limiter configured from the environment
+
+    OPENAI_RPM_LIMIT / OPENAI_TPM_LIMIT set the account limits and
+    OPENAI_RATE_STATE_FILE enables sharing the budget across processes.
+    """
+    global _default_limiter
+    if _default_limiter is None:
+        with _default_lock:
+            if _default_limiter is None:
+                _default_limiter = TokenBucketLimiter(
+                    rpm=int(os.getenv("OPENAI_RPM_LIMIT", "500")),
+                    tpm=int(os.getenv("OPENAI_TPM_LIMIT", "200000")),
+                    state_path=os.getenv("OPENAI_RATE_STATE_FILE")
+                )
+    return _default_limiter
@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+from typing import Dict, List, Any, Iterable, Optional
+
+# 모델별 가격 (USD / 1M 토큰): 입력, 캐시된 입력, 출력
+MODEL_PRICES = {
+    "gpt-4.1": {"input": 2.00, "cached_input": 0.50, "output": 8.00},
+    "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60},
+    "gpt-4.1-nano": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+}
+
+COLUMNS = [
+    "ts", "session_id", "section", "model", "outcome", "latency",
+    "attempts", "prompt_tokens", "cached_tokens", "completion_tokens",
+    "tier", "preferred_tier"
+]
+GROUPABLE = {"session_id", "section", "model", "outcome", "tier", "preferred_tier"}
+# 이전 버전에서 만든 원장에 나중에 추가된 열 (라우팅 결정)
+ADDED_COLUMNS = {"tier": "TEXT", "preferred_tier": "TEXT"}
+
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimated USD cost of a call from its token usage
+
+    Args:
+        model: Model name
+        prompt_tokens: Prompt tokens, including cached ones
+        cached_tokens: Prompt tokens served from the provider's prefix cache
+        completion_tokens: Completion tokens
+
+    Returns:
+        Cost in USD (0.0 for models without a price entry)
+    """
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return 0.0
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (uncached * prices["input"] + cached_tokens * prices["cached_input"]
+            + completion_tokens * prices["output"]) / 1_000_000
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+
+class UsageLedger:
+    """
+    Append-only SQLite ledger of GPT calls
+
+    record() only enqueues; a background thread writes rows in batches so
+    accounting stays off the request path.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        """
+        Args:
+            path: SQLite database file
+            flush_interval: Maximum seconds a record waits before being written
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        self._write_lock = threading.Lock()
+
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS gpt_calls ("
+                    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                    " ts REAL NOT NULL,"
+                    " session_id TEXT,"
+                    " section TEXT,"
+                    " model TEXT,"
+                    " outcome TEXT NOT NULL,"
+                    " latency REAL NOT NULL,"
+                    " attempts INTEGER NOT NULL DEFAULT 0,"
+                    " prompt_tokens INTEGER NOT NULL DEFAULT 0,"
+                    " cached_tokens INTEGER NOT NULL DEFAULT 0,"
+                    " completion_tokens INTEGER NOT NULL DEFAULT 0,"
+                    " tier TEXT,"
+                    " preferred_tier TEXT)"
+                )
+                existing = {row[1] for row in conn.execute("PRAGMA table_info(gpt_calls)")}
+                for column, column_type in ADDED_COLUMNS.items():
+                    if column not in existing:
+                        conn.execute(f"ALTER TABLE gpt_calls ADD COLUMN {column} {column_type}")
+                conn.execute("CREATE INDEX IF NOT EXISTS gpt_calls_ts ON gpt_calls (ts)")
+        finally:
+            conn.close()
+
+        self._writer = threading.Thread(target=self._run, name="usage-ledger", daemon=True)
+        self._writer.start()
+
+    def record(self, session_id: Optional[str], section: Optional[str], model: Optional[str],
+               outcome: str, latency: float, attempts: int = 0, prompt_tokens: int = 0,
+               cached_tokens: int = 0, completion_tokens: int = 0,
+               tier: Optional[str] = None, preferred_tier: Optional[str] = None) -> None:
+        """
+        Append one call to the ledger (non-blocking)
+
+        Args:
+            session_id: App session that made the call
+            section: Enhancer section name
+            model: Model the call was routed to
+            outcome: ok, cache_hit, store_hit, coalesced, shared_cache_hit,
+                empty, failed, rate_limited, breaker_open, bad_request or batch_queued
+            latency: Seconds spent in the call, including waits and retries
+            attempts: Upstream attempts made
+            prompt_tokens: Prompt tokens reported by the API
+            cached_tokens: Prompt tokens served from the provider's prefix cache
+            completion_tokens: Completion tokens reported by the API
+            tier: Model tier the router chose
+            preferred_tier: Section's preferred tier (differs from tier when
+                the router downgraded the call for latency)
+        """
+        self._queue.put((time.time(), session_id, section, model, outcome, latency,
+                         attempts, prompt_tokens, cached_tokens, completion_tokens,
+                         tier, preferred_tier))
+
+    def _run(self) -> None:
+        while True:
+            rows = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while time.monotonic() < deadline:
+                try:
+                    rows.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write(rows)
+            except Exception as e:
+                # 기록 스레드가 죽으면 flush()가 영원히 대기하므로 실패한 묶음만 버리고 계속 실행
+                print(f"Error in GPT usage ledger writer: {e}")
+
+    def _write(self, rows: List[tuple]) -> None:
+        """Write one batch of rows; failed batches are dropped with a warning"""
+        try:
+            with self._write_lock:
+                conn = None
+                try:
+                    conn = sqlite3.connect(self.path, timeout=30)
+                    with conn:
+                        conn.executemany(
+                            f"INSERT INTO gpt_calls ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                            rows
+                        )
+                except Exception as e:
+                    print(f"Error writing GPT usage ledger: {e}")
+                finally:
+                    if conn is not None:
+                        conn.close()
+        finally:
+            # 쓰기 성공 여부와 무관하게 완료 처리해야 flush()가 반환됨
+            for _ in rows:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued record has been written"""
+        self._queue.join()
+
+    def rows(self, since: Optional[float] = None, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return ledger rows as dictionaries
+
+        Args:
+            since: Only rows with a UNIX timestamp at or after this value
+            session_id: Only rows for this session
+        """
+        self.flush()
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM gpt_calls{where} ORDER BY id", params)
+            return [dict(zip(COLUMNS, row)) for row in cursor]
+        finally:
+            conn.close()
+
+    def report(self, group_by: Iterable[str] = ("section",), since: Optional[float] = None,
+               session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Aggregate calls, routing downgrades, tokens, estimated cost and latency
+
+        Args:
+            group_by: Any of session_id, section, model, outcome, tier, preferred_tier
+            since: Only include calls at or after this UNIX timestamp
+            session_id: Only include calls for this session
+
+        Returns:
+            One dictionary per group, sorted by estimated cost (highest first)
+        """
+        group_by = tuple(group_by)
+        unknown = set(group_by) - GROUPABLE
+        if unknown:
+            raise ValueError(f"Cannot group by: {', '.join(sorted(unknown))}")
+
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        for row in self.rows(since, session_id):
+            key = tuple(row[column] for column in group_by)
+            group = groups.setdefault(key, {
+                **dict(zip(group_by, key)),
+                "calls": 0, "upstream_calls": 0, "downgraded": 0, "attempts": 0,
+                "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+                "cost_usd": 0.0, "_latencies": [], "_upstream_latencies": []
+            })
+            group["calls"] += 1
+            if row["tier"] is not None and row["tier"] != row["preferred_tier"]:
+                group["downgraded"] += 1
+            group["attempts"] += row["attempts"]
+            group["prompt_tokens"] += row["prompt_tokens"]
+            group["cached_tokens"] += row["cached_tokens"]
+            group["completion_tokens"] += row["completion_tokens"]
+            group["cost_usd"] += estimate_cost(row["model"], row["prompt_tokens"],
+                                               row["cached_tokens"], row["completion_tokens"])
+            group["_latencies"].append(row["latency"])
+            if row["attempts"]:
+                group["upstream_calls"] += 1
+                group["_upstream_latencies"].append(row["latency"])
+
+        report = []
+        for group in groups.values():
+            latencies = group.pop("_latencies")
+            upstream = group.pop("_upstream_latencies")
+            group["total_latency"] = sum(latencies)
+            group["latency_p50"] = _percentile(latencies, 50)
+            group["latency_p95"] = _percentile(latencies, 95)
+            group["upstream_latency_p50"] = _percentile(upstream, 50)
+            group["upstream_latency_p95"] = _percentile(upstream, 95)
+            report.append(group)
+        report.sort(key=lambda group: (group["cost_usd"], group["total_latency"]), reverse=True)
+        return report
+
+
+_default_ledger: Optional[UsageLedger] = None
+_default_lock = threading.Lock()
+
+
+def get_usage_ledger() -> Optional[UsageLedger]:
+    """
+    Return the process-wide ledger at GPT_USAGE_LEDGER
+    (default gpt_usage_ledger.sqlite3; set it to an empty string to disable)
+    """
+    global _default_ledger
+    path = os.getenv("GPT_USAGE_LEDGER", "gpt_usage_ledger.sqlite3")
+    if not path:
+        return None
+    if _default_ledger is None:
+        with _default_lock:
+            if _default_ledger is None:
+                _default_ledger = UsageLedger(path)
+    return _default_ledger
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GPT usage, cost and latency report")
+    parser.add_argument("--ledger", default=os.getenv("GPT_USAGE_LEDGER", "gpt_usage_ledger.sqlite3"))
+    parser.add_argument("--by", default="section",
+                        help="Comma-separated: session_id, section, model, outcome, tier, preferred_tier")
+    parser.add_argument("--hours", type=float, default=None, help="Only include the last N hours")
+    parser.add_argument("--session", default=None)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    ledger = UsageLedger(args.ledger)
+    since = time.time() - args.hours * 3600 if args.hours else None
+    group_by = [column.strip() for column in args.by.split(",") if column.strip()]
+    report = ledger.report(group_by, since, args.session)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    header = f"{'/'.join(group_by):<36}{'calls':>7}{'upstrm':>8}{'downgr':>8}{'in_tok':>10}{'out_tok':>10}{'cost$':>10}{'p50':>8}{'p95':>8}"
+    print(header)
+    for group in report:
+        label = "/".join(str(group[column]) for column in group_by)
+        print(f"{label:<36}{group['calls']:>7}{group['upstream_calls']:>8}{group['downgraded']:>8}{group['prompt_tokens']:>10}"
+              f"{group['completion_tokens']:>10}{group['cost_usd']:>10.4f}"
+              f"{group['latency_p50']:>8.2f}{group['latency_p95']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()